@@ -5,407 +5,2753 @@ Args: event - dict with httpMethod, body, queryStringParameters, headers
 Returns: HTTP response dict with articles data
 '''
 
-import json
+import base64
+import csv
+import gzip
+import hashlib
+import hmac
+import html
+import importlib
+import io
+import math
 import os
+import random
 import re
-from datetime import datetime
-from typing import Dict, Any, Optional, List
-import psycopg2
-from psycopg2.extras import RealDictCursor
-import jwt
-from pydantic import BaseModel, Field, ValidationError
+import sys
+import threading
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from functools import lru_cache, wraps
+from html.parser import HTMLParser
+from types import SimpleNamespace
+from typing import Dict, Any, Optional, List, Tuple
+from urllib.parse import urlsplit
+import orjson
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
-class CreateArticleRequest(BaseModel):
-    title: str = Field(..., min_length=1, max_length=500)
-    content: str = Field(..., min_length=1)
-    preview_text: Optional[str] = None
-    category: Optional[str] = None
-    main_image_url: Optional[str] = None
-    status: str = Field(default='draft', pattern='^(draft|published)$')
 
+class LazyModule:
+    '''
+    Stand-in for a heavy dependency that is imported on first attribute
+    access, so paths that never touch it (e.g. OPTIONS preflights) skip it.
+    '''
 
-class UpdateArticleRequest(BaseModel):
-    title: Optional[str] = Field(None, max_length=500)
-    content: Optional[str] = None
-    preview_text: Optional[str] = None
-    category: Optional[str] = None
-    main_image_url: Optional[str] = None
-    status: Optional[str] = Field(None, pattern='^(draft|published)$')
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
 
+    def load(self) -> Any:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
 
-class UpdateProgressRequest(BaseModel):
-    article_id: int
-    progress_percent: int = Field(..., ge=0, le=100)
-    completed: bool = False
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.load(), attr)
+
+
+psycopg2 = LazyModule('psycopg2')
+asyncio = LazyModule('asyncio')
+asyncpg = LazyModule('asyncpg')
+extras = LazyModule('psycopg2.extras')
+extensions = LazyModule('psycopg2.extensions')
+pg_errors = LazyModule('psycopg2.errors')
+jwt = LazyModule('jwt')
+
+
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '1'))
+TRACE_SLOW_MS = float(os.environ.get('TRACE_SLOW_MS', '1000'))
+TRACE_SERVER_TIMING = os.environ.get('TRACE_SERVER_TIMING', '0') == '1'
+
+
+class RequestTrace:
+    '''
+    Span timings and SQL counters for one invocation. Spans with the same
+    name accumulate, so "db" is the total time spent inside cursor calls.
+    '''
+
+    def __init__(self, request_id: Optional[str]):
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self.queries = 0
+        self.rows = 0
+
+    def add(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def span_ms(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 3) for name, seconds in self.spans.items()}
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar('current_trace', default=None)
+_last_trace: ContextVar[Optional[RequestTrace]] = ContextVar('last_trace', default=None)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+def last_trace() -> Optional[RequestTrace]:
+    return _last_trace.get()
+
+
+@contextmanager
+def span(name: str):
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - started)
+
+
+def traced(func):
+    name = func.__name__
+    
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with span(name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def traced_async(func):
+    name = func.__name__
+    
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        with span(name):
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+@lru_cache(maxsize=None)
+def traced_cursor_class(base: type) -> type:
+    class TracedCursor(base):
+        def execute(self, query, vars=None):
+            trace = current_trace()
+            if trace is None:
+                return super().execute(query, vars)
+            started = time.perf_counter()
+            try:
+                return super().execute(query, vars)
+            finally:
+                trace.queries += 1
+                trace.add('db', time.perf_counter() - started)
+
+        def executemany(self, query, vars_list):
+            trace = current_trace()
+            if trace is None:
+                return super().executemany(query, vars_list)
+            started = time.perf_counter()
+            try:
+                return super().executemany(query, vars_list)
+            finally:
+                trace.queries += 1
+                trace.add('db', time.perf_counter() - started)
+
+        def fetchone(self):
+            row = super().fetchone()
+            trace = current_trace()
+            if trace is not None and row is not None:
+                trace.rows += 1
+            return row
+
+        def fetchmany(self, size=None):
+            rows = super().fetchmany(size) if size is not None else super().fetchmany()
+            trace = current_trace()
+            if trace is not None:
+                trace.rows += len(rows)
+            return rows
+
+        def fetchall(self):
+            rows = super().fetchall()
+            trace = current_trace()
+            if trace is not None:
+                trace.rows += len(rows)
+            return rows
+
+    TracedCursor.__name__ = 'Traced' + base.__name__
+    return TracedCursor
+
+
+@lru_cache(maxsize=None)
+def traced_connection_class() -> type:
+    class TracedConnection(extensions.connection):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.prepared_statements: set = set()
+
+        def cursor(self, *args, **kwargs):
+            base = kwargs.pop('cursor_factory', None) or extensions.cursor
+            return super().cursor(*args, cursor_factory=traced_cursor_class(base), **kwargs)
+
+    return TracedConnection
+
+
+def begin_trace(context: Any) -> RequestTrace:
+    trace = RequestTrace(getattr(context, 'request_id', None))
+    _current_trace.set(trace)
+    return trace
+
+
+def end_trace(trace: RequestTrace, event: Dict[str, Any], context: Any,
+              response: Optional[Dict[str, Any]], error: Optional[BaseException] = None) -> Optional[Dict[str, Any]]:
+    _current_trace.set(None)
+    _last_trace.set(trace)
+    duration_ms = trace.elapsed_ms()
+    
+    if duration_ms >= TRACE_SLOW_MS or random.random() < TRACE_SAMPLE_RATE:
+        record = {
+            'trace': 'request',
+            'request_id': trace.request_id,
+            'function': getattr(context, 'function_name', None),
+            'method': event.get('httpMethod'),
+            'status': response.get('statusCode') if response else 500,
+            'duration_ms': round(duration_ms, 3),
+            'queries': trace.queries,
+            'rows': trace.rows,
+            'spans': trace.span_ms()
+        }
+        if error is not None:
+            record['error'] = type(error).__name__
+        sys.stdout.write(orjson.dumps(record).decode('utf-8') + '\n')
+    
+    if TRACE_SERVER_TIMING and response is not None:
+        timing = ', '.join(f'{name};dur={ms:.1f}' for name, ms in trace.span_ms().items())
+        response = {
+            **response,
+            'headers': {
+                **response['headers'],
+                'Server-Timing': f'{timing}, total;dur={duration_ms:.1f}' if timing else f'total;dur={duration_ms:.1f}',
+                'Timing-Allow-Origin': '*'
+            }
+        }
+    return response
+
+
+@lru_cache(maxsize=None)
+def request_models() -> SimpleNamespace:
+    from pydantic import BaseModel, ConfigDict, Field
+    
+    class CreateArticleRequest(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        title: str = Field(..., min_length=1, max_length=500)
+        content: str = Field(..., min_length=1)
+        preview_text: Optional[str] = None
+        category: Optional[str] = None
+        main_image_url: Optional[str] = None
+        status: str = Field(default='draft', pattern='^(draft|published)$')
+    
+    class UpdateArticleRequest(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        title: Optional[str] = Field(None, max_length=500)
+        content: Optional[str] = None
+        preview_text: Optional[str] = None
+        category: Optional[str] = None
+        main_image_url: Optional[str] = None
+        status: Optional[str] = Field(None, pattern='^(draft|published)$')
+    
+    class ListArticlesQuery(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        status: Optional[str] = Field(None, pattern='^(draft|published)$')
+        category: Optional[str] = None
+        limit: int = Field(default=int(os.environ.get('ARTICLES_PAGE_SIZE', '20')), ge=1, le=100)
+        cursor: Optional[str] = None
+        view: str = Field(default='summary', pattern='^(summary|full)$')
+    
+    class SearchArticlesQuery(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        q: str = Field(..., min_length=1, max_length=200)
+        category: Optional[str] = None
+        status: str = Field(default='published', pattern='^(draft|published)$')
+        limit: int = Field(default=int(os.environ.get('ARTICLES_PAGE_SIZE', '20')), ge=1, le=100)
+        offset: int = Field(default=0, ge=0, le=1000)
+    
+    class SyncArticlesQuery(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        since: str = Field(..., max_length=200)
+        status: Optional[str] = Field(None, pattern='^(draft|published)$')
+        category: Optional[str] = None
+        limit: int = Field(default=int(os.environ.get('ARTICLES_SYNC_PAGE_SIZE', '100')), ge=1, le=500)
+        view: str = Field(default='summary', pattern='^(summary|full)$')
+    
+    class UpdateProgressRequest(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        article_id: int
+        progress_percent: int = Field(..., ge=0, le=100)
+        completed: bool = False
+    
+    class UpdateProgressBatchRequest(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        entries: List[UpdateProgressRequest] = Field(..., min_length=1, max_length=500)
+    
+    class ProgressQuery(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        view: str = Field(default='list', pattern='^(list|summary)$')
+        limit: int = Field(default=int(os.environ.get('PROGRESS_PAGE_SIZE', '50')), ge=1, le=200)
+        cursor: Optional[str] = None
+    
+    class BatchItem(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        query: Dict[str, str] = Field(default_factory=dict)
+        headers: Dict[str, str] = Field(default_factory=dict)
+    
+    class BatchRequest(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        requests: List[BatchItem] = Field(..., min_length=1, max_length=int(os.environ.get('BATCH_MAX_ITEMS', '20')))
+    
+    return SimpleNamespace(
+        CreateArticleRequest=CreateArticleRequest,
+        UpdateArticleRequest=UpdateArticleRequest,
+        ListArticlesQuery=ListArticlesQuery,
+        SearchArticlesQuery=SearchArticlesQuery,
+        SyncArticlesQuery=SyncArticlesQuery,
+        UpdateProgressRequest=UpdateProgressRequest,
+        UpdateProgressBatchRequest=UpdateProgressBatchRequest,
+        ProgressQuery=ProgressQuery,
+        BatchItem=BatchItem,
+        BatchRequest=BatchRequest
+    )
+
+
+JSON_HEADERS = {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'}
+CORS_HEADERS = {'Access-Control-Allow-Origin': '*'}
+OPTIONS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, X-Auth-Token, If-None-Match, X-Read-Primary-Until',
+    'Access-Control-Max-Age': '86400'
+}
+RESPONSE_COMPRESS_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESS_MIN_BYTES', '1024'))
+RESPONSE_BROTLI_QUALITY = 5
+RESPONSE_GZIP_LEVEL = 6
+ZERO_QVALUE = re.compile(r'^q=0(?:\.0{0,3})?$')
+
+
+def dumps(payload: Any) -> str:
+    return orjson.dumps(payload, option=orjson.OPT_NAIVE_UTC).decode('utf-8')
+
+
+def build_response(status_code: int, body: str, extra_headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    return {
+        'statusCode': status_code,
+        'headers': {**JSON_HEADERS, **extra_headers} if extra_headers else JSON_HEADERS,
+        'body': body
+    }
+
+
+def json_response(status_code: int, payload: Any, extra_headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    with span('serialize'):
+        body = dumps(payload)
+    return build_response(status_code, body, extra_headers)
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> set:
+    encodings = set()
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.partition(';')
+        if not ZERO_QVALUE.match(params.replace(' ', '')):
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+def compress_response(response: Dict[str, Any], request_headers: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    body = response.get('body')
+    if not body or response.get('isBase64Encoded') or len(body) < RESPONSE_COMPRESS_MIN_BYTES:
+        return response
+    
+    encodings = accepted_encodings(get_header(request_headers, 'Accept-Encoding'))
+    headers = {**response['headers'], 'Vary': 'Accept-Encoding'}
+    if brotli and 'br' in encodings:
+        encoding, data = 'br', brotli.compress(body.encode('utf-8'), quality=RESPONSE_BROTLI_QUALITY)
+    elif 'gzip' in encodings:
+        encoding, data = 'gzip', gzip.compress(body.encode('utf-8'), compresslevel=RESPONSE_GZIP_LEVEL, mtime=0)
+    else:
+        return {**response, 'headers': headers}
+    
+    headers['Content-Encoding'] = encoding
+    if 'ETag' in headers:
+        headers['ETag'] = f'{headers["ETag"][:-1]}-{encoding}"'
+    return {
+        **response,
+        'headers': headers,
+        'body': base64.b64encode(data).decode('ascii'),
+        'isBase64Encoded': True
+    }
+
+
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', '4'))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '5'))
+DB_POOL_HEALTHCHECK_AFTER = float(os.environ.get('DB_POOL_HEALTHCHECK_AFTER', '10'))
+DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', '5'))
+
+
+class PoolExhaustedError(Exception):
+    pass
+
+
+class ConnectionPool:
+    '''
+    Bounded pool of psycopg2 connections kept alive across warm invocations.
+    Idle connections are reset (and pinged if idle for a while) before reuse;
+    broken ones are dropped and replaced on demand.
+    '''
+
+    def __init__(self, dsn: str, max_size: int, timeout: float, healthcheck_after: float):
+        self.dsn = dsn
+        self.max_size = max_size
+        self.timeout = timeout
+        self.healthcheck_after = healthcheck_after
+        self._idle: List[Tuple[Any, float]] = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self.counters = {'hits': 0, 'misses': 0, 'discarded': 0, 'timeouts': 0}
+
+    def _count(self, name: str) -> None:
+        with self._cond:
+            self.counters[name] += 1
+
+    def _reset(self, conn: Any, idle_since: float) -> bool:
+        if conn.closed or conn.get_transaction_status() == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        try:
+            if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            conn.set_session(isolation_level='DEFAULT', readonly='DEFAULT', deferrable='DEFAULT', autocommit=False)
+            if time.monotonic() - idle_since >= self.healthcheck_after:
+                with conn.cursor() as cur:
+                    cur.execute('SELECT 1')
+                conn.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _discard(self, conn: Any) -> None:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        with self._cond:
+            self._size -= 1
+            self.counters['discarded'] += 1
+            self._cond.notify()
+
+    def getconn(self) -> Any:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn = None
+            with self._cond:
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.counters['timeouts'] += 1
+                        raise PoolExhaustedError(f'No free database connection within {self.timeout}s')
+                    self._cond.wait(remaining)
+                    continue
+            
+            if conn is None:
+                try:
+                    conn = psycopg2.connect(
+                        self.dsn,
+                        connect_timeout=DB_CONNECT_TIMEOUT,
+                        connection_factory=traced_connection_class()
+                    )
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                self._count('misses')
+                return conn
+            
+            if self._reset(conn, idle_since):
+                self._count('hits')
+                return conn
+            self._discard(conn)
+
+    def putconn(self, conn: Any, discard: bool = False) -> None:
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        if discard or conn.closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        with span('db_connect'):
+            conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, discard=broken)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {**self.counters, 'size': self._size, 'idle': len(self._idle), 'max_size': self.max_size}
+
+
+_db_pool: Optional[ConnectionPool] = None
+_db_pool_lock = threading.Lock()
+
+
+def get_db_pool() -> ConnectionPool:
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = ConnectionPool(
+                    os.environ.get('DATABASE_URL'),
+                    max_size=DB_POOL_MAX_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    healthcheck_after=DB_POOL_HEALTHCHECK_AFTER
+                )
+    return _db_pool
 
 
 def get_db_connection():
-    database_url = os.environ.get('DATABASE_URL')
-    return psycopg2.connect(database_url)
+    return get_db_pool().connection()
+
+
+DB_ASYNC_POOL_MAX_SIZE = int(os.environ.get('DB_ASYNC_POOL_MAX_SIZE', '10'))
+
+
+async def init_async_connection(conn: Any) -> None:
+    await conn.set_type_codec('jsonb', schema='pg_catalog', encoder=dumps, decoder=orjson.loads)
+
+
+class AsyncPools:
+    '''
+    asyncpg pools for the async handler, one per DSN. A pool belongs to the
+    event loop that created it, so a different loop gets a fresh pool.
+    '''
+
+    def __init__(self):
+        self._pools: Dict[str, Tuple[Any, Any]] = {}
+
+    async def get(self, dsn: str) -> Any:
+        loop = asyncio.get_running_loop()
+        entry = self._pools.get(dsn)
+        if entry is None or entry[0] is not loop:
+            entry = (loop, asyncio.ensure_future(asyncpg.create_pool(
+                dsn,
+                min_size=0,
+                max_size=DB_ASYNC_POOL_MAX_SIZE,
+                timeout=DB_CONNECT_TIMEOUT,
+                statement_cache_size=100 if DB_PREPARED_STATEMENTS else 0,
+                init=init_async_connection
+            )))
+            self._pools[dsn] = entry
+        try:
+            return await entry[1]
+        except Exception:
+            if self._pools.get(dsn) is entry:
+                del self._pools[dsn]
+            raise
+
+
+async_pools = AsyncPools()
+
+
+def async_db_errors() -> Tuple[type, ...]:
+    return (OSError, asyncio.TimeoutError, asyncpg.InterfaceError, asyncpg.PostgresConnectionError, asyncpg.CannotConnectNowError)
+
+
+async def get_async_db() -> Any:
+    with span('db_connect'):
+        return await async_pools.get(os.environ.get('DATABASE_URL'))
+
+
+async def async_fetch(db: Any, sql: str, *args: Any) -> List[Dict[str, Any]]:
+    trace = current_trace()
+    started = time.perf_counter()
+    try:
+        rows = await db.fetch(sql, *args)
+    finally:
+        if trace is not None:
+            trace.queries += 1
+            trace.add('db', time.perf_counter() - started)
+    if trace is not None:
+        trace.rows += len(rows)
+    return [dict(row) for row in rows]
+
+
+async def async_fetchrow(db: Any, sql: str, *args: Any) -> Optional[Dict[str, Any]]:
+    rows = await async_fetch(db, sql, *args)
+    return rows[0] if rows else None
+
+
+DB_REPLICA_MAX_LAG = float(os.environ.get('DB_REPLICA_MAX_LAG', '5'))
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get('DB_REPLICA_LAG_CHECK_INTERVAL', '5'))
+DB_REPLICA_RETRY_AFTER = float(os.environ.get('DB_REPLICA_RETRY_AFTER', '30'))
+DB_READ_YOUR_WRITES_SECONDS = float(os.environ.get('DB_READ_YOUR_WRITES_SECONDS', '5'))
+READ_PRIMARY_HEADER = 'X-Read-Primary-Until'
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class Replica:
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        self.lag: Optional[float] = None
+        self.checked_at = 0.0
+        self.unavailable_until = 0.0
+
+    def usable(self, now: float) -> bool:
+        if self.unavailable_until > now:
+            return False
+        return not (self.lag is not None and self.lag > DB_REPLICA_MAX_LAG
+                    and now - self.checked_at < DB_REPLICA_LAG_CHECK_INTERVAL)
+
+    def lag_check_due(self) -> bool:
+        return time.monotonic() - self.checked_at >= DB_REPLICA_LAG_CHECK_INTERVAL
+
+    def record_lag(self, lag: Any) -> None:
+        self.lag = float(lag)
+        self.checked_at = time.monotonic()
+
+    def mark_unavailable(self) -> None:
+        self.unavailable_until = time.monotonic() + DB_REPLICA_RETRY_AFTER
+
+
+class ReadRouter:
+    '''
+    Routes read-only handlers to the DATABASE_READ_URL replicas in turn.
+    A replica that cannot be reached sits out DB_REPLICA_RETRY_AFTER seconds,
+    one lagging more than DB_REPLICA_MAX_LAG sits out until its next lag
+    check, and requests that carry a read-primary token stay on the primary.
+    With no usable replica reads fall back to the primary.
+    '''
+
+    def __init__(self, dsns: List[str]):
+        self.replicas = [
+            Replica(ConnectionPool(dsn, max_size=DB_POOL_MAX_SIZE, timeout=DB_POOL_TIMEOUT, healthcheck_after=DB_POOL_HEALTHCHECK_AFTER))
+            for dsn in dsns
+        ]
+        self._next = 0
+        self._lock = threading.Lock()
+        self.counters = {'replica': 0, 'primary': 0, 'pinned': 0, 'unavailable': 0, 'lagging': 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def _candidates(self) -> List[Replica]:
+        now = time.monotonic()
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.usable(now)]
+
+    def _wants_replica(self, primary: bool) -> bool:
+        if primary:
+            self._count('pinned')
+            return False
+        return bool(self.replicas)
+
+    def _acquire(self) -> Optional[Tuple[Replica, Any]]:
+        for replica in self._candidates():
+            try:
+                conn = replica.pool.getconn()
+                if replica.lag_check_due():
+                    try:
+                        with conn.cursor() as cur:
+                            cur.execute(REPLICA_LAG_SQL)
+                            replica.record_lag(cur.fetchone()[0])
+                        conn.rollback()
+                    except psycopg2.Error:
+                        replica.pool.putconn(conn, discard=True)
+                        raise
+            except PoolExhaustedError:
+                self._count('unavailable')
+                continue
+            except psycopg2.Error:
+                replica.mark_unavailable()
+                self._count('unavailable')
+                continue
+            
+            if replica.lag > DB_REPLICA_MAX_LAG:
+                replica.pool.putconn(conn)
+                self._count('lagging')
+                continue
+            return replica, conn
+        return None
+
+    @contextmanager
+    def connection(self, primary: bool = False):
+        acquired = None
+        if self._wants_replica(primary):
+            with span('db_connect'):
+                acquired = self._acquire()
+        
+        if acquired is None:
+            if self.replicas:
+                self._count('primary')
+            with get_db_connection() as conn:
+                yield conn
+            return
+        
+        replica, conn = acquired
+        self._count('replica')
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            replica.mark_unavailable()
+            raise
+        finally:
+            replica.pool.putconn(conn, discard=broken)
+
+    async def _acquire_async(self) -> Optional[Tuple[Replica, Any]]:
+        for replica in self._candidates():
+            try:
+                db = await async_pools.get(replica.pool.dsn)
+                if replica.lag_check_due():
+                    replica.record_lag(await db.fetchval(REPLICA_LAG_SQL))
+            except async_db_errors():
+                replica.mark_unavailable()
+                self._count('unavailable')
+                continue
+            
+            if replica.lag > DB_REPLICA_MAX_LAG:
+                self._count('lagging')
+                continue
+            return replica, db
+        return None
+
+    @asynccontextmanager
+    async def async_database(self, primary: bool = False):
+        acquired = None
+        if self._wants_replica(primary):
+            with span('db_connect'):
+                acquired = await self._acquire_async()
+        
+        if acquired is None:
+            if self.replicas:
+                self._count('primary')
+            yield await get_async_db()
+            return
+        
+        replica, db = acquired
+        self._count('replica')
+        try:
+            yield db
+        except async_db_errors():
+            replica.mark_unavailable()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+        now = time.monotonic()
+        return {
+            **counters,
+            'replicas': [
+                {
+                    'lag': replica.lag,
+                    'available': replica.unavailable_until <= now,
+                    'pool': replica.pool.stats()
+                }
+                for replica in self.replicas
+            ]
+        }
+
+
+read_router = ReadRouter(os.environ.get('DATABASE_READ_URL', '').split())
+read_primary: ContextVar[bool] = ContextVar('read_primary', default=False)
+
+
+batch_connection: ContextVar[Optional[Any]] = ContextVar('batch_connection', default=None)
+
+
+def get_read_connection():
+    shared = batch_connection.get()
+    if shared is not None:
+        return nullcontext(shared)
+    return read_router.connection(read_primary.get())
+
+
+def read_primary_token(until: int) -> str:
+    signature = hmac.new(JWT_SECRET.encode('utf-8'), f'read-primary|{until}'.encode('ascii'), hashlib.sha256).hexdigest()
+    return f'{until}.{signature[:32]}'
+
+
+def read_primary_requested(headers: Dict[str, Any]) -> bool:
+    token = get_header(headers, READ_PRIMARY_HEADER)
+    if not token:
+        return False
+    until = token.partition('.')[0]
+    if not until.isdigit() or int(until) <= time.time():
+        return False
+    return hmac.compare_digest(read_primary_token(int(until)), token)
+
+
+def read_primary_headers() -> Dict[str, str]:
+    if not read_router.replicas:
+        return {}
+    return {
+        READ_PRIMARY_HEADER: read_primary_token(math.ceil(time.time() + DB_READ_YOUR_WRITES_SECONDS)),
+        'Access-Control-Expose-Headers': READ_PRIMARY_HEADER
+    }
+
+
+DB_PREPARED_STATEMENTS = os.environ.get('DB_PREPARED_STATEMENTS', '1') == '1'
+STATEMENT_PARAM_PATTERN = re.compile(r'\$(\d+)')
+
+
+class StatementRegistry:
+    '''
+    Hot statements written with $n placeholders, PREPAREd once per pooled
+    connection and then run with EXECUTE. With DB_PREPARED_STATEMENTS=0
+    (e.g. behind a transaction-mode PgBouncer) the same text is sent as a
+    regular parameterised query.
+    '''
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.statements: Dict[str, Tuple[str, str]] = {}
+        self.counters = {'prepared': 0, 'executed': 0}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, sql: str) -> None:
+        fallback = STATEMENT_PARAM_PATTERN.sub(r'%(p\1)s', sql.replace('%', '%%'))
+        self.statements[name] = (sql, fallback)
+
+    def execute(self, cur: Any, name: str, params: Tuple[Any, ...]) -> None:
+        sql, fallback = self.statements[name]
+        if not self.enabled:
+            cur.execute(fallback, {f'p{i}': value for i, value in enumerate(params, 1)})
+            return
+        
+        prepared = cur.connection.prepared_statements
+        if name not in prepared:
+            cur.execute(f'PREPARE {name} AS {sql}')
+            prepared.add(name)
+            with self._lock:
+                self.counters['prepared'] += 1
+        
+        cur.execute(f'EXECUTE {name} ({", ".join(["%s"] * len(params))})', params)
+        with self._lock:
+            self.counters['executed'] += 1
+
+    def sql(self, name: str) -> str:
+        return self.statements[name][0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, 'enabled': self.enabled, 'registered': len(self.statements)}
+
+
+statements = StatementRegistry(DB_PREPARED_STATEMENTS)
+
+
+ARTICLES_CACHE_MAX_BYTES = int(os.environ.get('ARTICLES_CACHE_MAX_BYTES', str(8 * 1024 * 1024)))
+ARTICLES_CACHE_TTL = float(os.environ.get('ARTICLES_CACHE_TTL', '300'))
+
+
+class ResponseCache:
+    '''
+    Size-bounded LRU cache of rendered JSON bodies with a TTL.
+    Each entry remembers the DB version it was rendered from and is only
+    served while the caller's freshly read version still matches.
+    '''
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: 'OrderedDict[Tuple[str, Any], Tuple[int, str, Dict[str, str], float, int]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'stale': 0, 'evictions': 0}
+
+    def _remove(self, key: Tuple[str, Any]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= entry[4]
+
+    def contains(self, key: Tuple[str, Any]) -> bool:
+        with self._lock:
+            if key in self._entries:
+                return True
+            self.counters['misses'] += 1
+            return False
+
+    def get(self, key: Tuple[str, Any], version: int) -> Optional[Tuple[str, Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.counters['misses'] += 1
+                return None
+            entry_version, body, headers, expires_at, _ = entry
+            if entry_version != version or expires_at <= time.monotonic():
+                self._remove(key)
+                self.counters['stale'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters['hits'] += 1
+            return body, headers
+
+    def put(self, key: Tuple[str, Any], version: int, body: str, headers: Dict[str, str]) -> None:
+        size = sys.getsizeof(body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (version, body, headers, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.counters['evictions'] += 1
+
+    def invalidate(self, key: Tuple[str, Any]) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_kind(self, kind: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == kind]:
+                self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, 'entries': len(self._entries), 'bytes': self._bytes, 'max_bytes': self.max_bytes}
+
+
+response_cache = ResponseCache(ARTICLES_CACHE_MAX_BYTES, ARTICLES_CACHE_TTL)
+
+
+JWT_SECRET = os.environ.get('JWT_SECRET', 'default-secret-key')
+JWT_ALGORITHMS = ['HS256']
+JWT_DECODE_OPTIONS = {'require': ['exp']}
+JWT_TOKEN_PATTERN = re.compile(r'^[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+$')
+JWT_MAX_LENGTH = 4096
+TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get('TOKEN_CACHE_MAX_ENTRIES', '1024'))
+TOKEN_NEGATIVE_TTL = float(os.environ.get('TOKEN_NEGATIVE_TTL', '60'))
+
+
+class TokenCache:
+    '''
+    Bounded cache of verified JWT claims keyed by token digest.
+    Valid entries live until the token's exp; rejected tokens are kept in a
+    separate LRU for a short while so repeats skip the HMAC check.
+    '''
+
+    def __init__(self, max_entries: int, negative_ttl: float):
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self._valid: 'OrderedDict[bytes, Tuple[Dict[str, Any], float]]' = OrderedDict()
+        self._invalid: 'OrderedDict[bytes, float]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'rejected': 0, 'evictions': 0}
+
+    def lookup(self, digest: bytes) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        now = time.time()
+        with self._lock:
+            entry = self._valid.get(digest)
+            if entry and entry[1] > now:
+                self._valid.move_to_end(digest)
+                self.counters['hits'] += 1
+                return True, entry[0]
+            if entry:
+                del self._valid[digest]
+            
+            rejected_until = self._invalid.get(digest)
+            if rejected_until and rejected_until > now:
+                self.counters['rejected'] += 1
+                return True, None
+            if rejected_until:
+                del self._invalid[digest]
+            
+            self.counters['misses'] += 1
+            return False, None
+
+    def _store(self, entries: 'OrderedDict[bytes, Any]', digest: bytes, value: Any) -> None:
+        with self._lock:
+            entries[digest] = value
+            entries.move_to_end(digest)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def put_valid(self, digest: bytes, claims: Dict[str, Any]) -> None:
+        self._store(self._valid, digest, (claims, float(claims['exp'])))
+
+    def put_invalid(self, digest: bytes) -> None:
+        self._store(self._invalid, digest, time.time() + self.negative_ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, 'valid': len(self._valid), 'invalid': len(self._invalid), 'max_entries': self.max_entries}
+
+
+token_cache = TokenCache(TOKEN_CACHE_MAX_ENTRIES, TOKEN_NEGATIVE_TTL)
+
+
+def verify_token(token: str) -> Optional[Dict[str, Any]]:
+    if not token or len(token) > JWT_MAX_LENGTH or not JWT_TOKEN_PATTERN.match(token):
+        return None
+    
+    digest = hashlib.sha256(token.encode('utf-8')).digest()
+    found, claims = token_cache.lookup(digest)
+    if found:
+        return claims
+    
+    try:
+        with span('jwt'):
+            claims = jwt.decode(token, JWT_SECRET, algorithms=JWT_ALGORITHMS, options=JWT_DECODE_OPTIONS)
+    except jwt.InvalidTokenError:
+        token_cache.put_invalid(digest)
+        return None
+    
+    token_cache.put_valid(digest, claims)
+    return claims
+
+
+SLUG_STRIP_PATTERN = re.compile(r'[^a-z0-9\s_-]')
+SLUG_SEPARATOR_PATTERN = re.compile(r'[-\s_]+')
+SLUG_MAX_LENGTH = 480
+SLUG_FALLBACK = 'article'
+SLUG_PROBES = 20
+SLUG_INSERT_ATTEMPTS = 3
+SLUG_CONSTRAINT = 'articles_slug_key'
+SLUG_TRANSLITERATION = str.maketrans({
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'e', 'ж': 'zh',
+    'з': 'z', 'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o',
+    'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'kh', 'ц': 'ts',
+    'ч': 'ch', 'ш': 'sh', 'щ': 'shch', 'ъ': '', 'ы': 'y', 'ь': '', 'э': 'e', 'ю': 'yu',
+    'я': 'ya', 'і': 'i', 'ї': 'yi', 'є': 'ye', 'ґ': 'g'
+})
+
+
+def generate_slug(title: str) -> str:
+    slug = unicodedata.normalize('NFKD', title.lower().translate(SLUG_TRANSLITERATION))
+    slug = slug.encode('ascii', 'ignore').decode('ascii')
+    slug = SLUG_STRIP_PATTERN.sub('', slug)
+    slug = SLUG_SEPARATOR_PATTERN.sub('-', slug).strip('-')
+    return slug[:SLUG_MAX_LENGTH].rstrip('-') or SLUG_FALLBACK
+
+
+def free_slug_sql(base: str, exclude_id: Optional[str] = None) -> str:
+    exclude = f' AND s.id <> {exclude_id}' if exclude_id else ''
+    return f"""COALESCE(
+        (SELECT c.candidate
+         FROM (
+             SELECT n, CASE WHEN n = 1 THEN {base} ELSE {base} || '-' || n END AS candidate
+             FROM generate_series(1, {SLUG_PROBES}) n
+         ) c
+         WHERE NOT EXISTS (SELECT 1 FROM articles s WHERE s.slug = c.candidate{exclude})
+         ORDER BY c.n
+         LIMIT 1),
+        {base} || '-' || substr(md5(random()::text), 1, 8)
+    )"""
+
+
+RENDER_ALLOWED_TAGS = {
+    'p': (), 'br': (), 'hr': (), 'strong': (), 'b': (), 'em': (), 'i': (), 's': (), 'u': (),
+    'code': (), 'pre': (), 'blockquote': (), 'ul': (), 'ol': ('start',), 'li': (),
+    'h1': (), 'h2': (), 'h3': (), 'h4': (), 'h5': (), 'h6': (),
+    'a': ('href', 'title', 'target'), 'img': ('src', 'alt', 'title'),
+    'div': ('data-youtube-video',), 'iframe': ('src', 'width', 'height', 'allowfullscreen')
+}
+RENDER_VOID_TAGS = {'br', 'hr', 'img'}
+RENDER_DROP_CONTENT_TAGS = {'script', 'style', 'template', 'noscript', 'object', 'embed', 'svg', 'math', 'textarea', 'select'}
+RENDER_BLOCK_TAGS = {'p', 'br', 'hr', 'pre', 'blockquote', 'ul', 'ol', 'li', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+RENDER_OUTLINE_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4}
+RENDER_URL_SCHEMES = {'', 'http', 'https', 'mailto'}
+RENDER_IFRAME_HOSTS = {'www.youtube.com', 'youtube.com', 'www.youtube-nocookie.com', 'youtube-nocookie.com'}
+RENDER_LINK_REL = 'noopener noreferrer nofollow'
+RENDER_URL_IGNORED = re.compile(r'[\x00-\x20]')
+RENDER_WORD_PATTERN = re.compile(r"\w+(?:[-'’]\w+)*")
+READING_WORDS_PER_MINUTE = int(os.environ.get('READING_WORDS_PER_MINUTE', '180'))
+EXCERPT_MAX_CHARS = int(os.environ.get('EXCERPT_MAX_CHARS', '280'))
+
+
+def safe_url(value: str, hosts: Optional[set] = None) -> Optional[str]:
+    url = RENDER_URL_IGNORED.sub('', value)
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    if parts.scheme.lower() not in RENDER_URL_SCHEMES:
+        return None
+    if hosts is not None and (parts.scheme.lower() not in ('http', 'https') or parts.hostname not in hosts):
+        return None
+    return url
+
+
+class ArticleRenderer(HTMLParser):
+    '''
+    Allow-list sanitizer for editor HTML that also collects the plain text
+    and the heading outline in the same pass. Unknown tags are unwrapped,
+    script-like tags are dropped with their content, and outline headings
+    get an id so the table of contents can link to them.
+    '''
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out: List[str] = []
+        self.text: List[str] = []
+        self.outline: List[Dict[str, Any]] = []
+        self._open: List[str] = []
+        self._skip: List[str] = []
+        self._heading: Optional[Tuple[str, int, int]] = None
+        self._anchors: Counter = Counter()
+
+    def _attributes(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> Optional[str]:
+        allowed = RENDER_ALLOWED_TAGS[tag]
+        rendered = []
+        for name, value in attrs:
+            if name not in allowed:
+                continue
+            value = value or ''
+            if name in ('src', 'href'):
+                value = safe_url(value, RENDER_IFRAME_HOSTS if tag == 'iframe' else None)
+                if value is None:
+                    continue
+            elif name in ('width', 'height', 'start') and not value.isdigit():
+                continue
+            elif name == 'target' and value != '_blank':
+                continue
+            elif name in ('allowfullscreen', 'data-youtube-video'):
+                rendered.append(f' {name}')
+                continue
+            rendered.append(f' {name}="{html.escape(value)}"')
+        if tag == 'a':
+            rendered.append(f' rel="{RENDER_LINK_REL}"')
+        if tag in ('iframe', 'img') and not any(part.startswith(' src=') for part in rendered):
+            return None
+        return ''.join(rendered)
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if self._skip or tag in RENDER_DROP_CONTENT_TAGS:
+            if tag not in RENDER_VOID_TAGS:
+                self._skip.append(tag)
+            return
+        if tag in RENDER_BLOCK_TAGS:
+            self.text.append(' ')
+        if tag not in RENDER_ALLOWED_TAGS:
+            return
+        attributes = self._attributes(tag, attrs)
+        if attributes is None:
+            return
+        if tag in RENDER_VOID_TAGS:
+            self.out.append(f'<{tag}{attributes}>')
+            return
+        if tag in RENDER_OUTLINE_TAGS and self._heading is None:
+            self._heading = (tag, len(self.out), len(self.text))
+        self.out.append(f'<{tag}{attributes}>')
+        self._open.append(tag)
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in RENDER_VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._skip:
+            if tag in self._skip:
+                del self._skip[len(self._skip) - 1 - self._skip[::-1].index(tag):]
+            return
+        if tag in RENDER_BLOCK_TAGS:
+            self.text.append(' ')
+        if tag not in self._open:
+            return
+        while self._open:
+            current = self._open.pop()
+            if self._heading and self._heading[0] == current:
+                self._close_heading()
+            self.out.append(f'</{current}>')
+            if current == tag:
+                break
+
+    def _close_heading(self) -> None:
+        tag, position, text_start = self._heading
+        self._heading = None
+        title = ' '.join(''.join(self.text[text_start:]).split())
+        if not title:
+            return
+        base = generate_slug(title)
+        self._anchors[base] += 1
+        anchor = base if self._anchors[base] == 1 else f'{base}-{self._anchors[base]}'
+        self.out[position] = f'<{tag} id="{anchor}">'
+        self.outline.append({'level': RENDER_OUTLINE_TAGS[tag], 'text': title, 'id': anchor})
+
+    def handle_data(self, data: str) -> None:
+        if self._skip:
+            return
+        self.out.append(html.escape(data, quote=False))
+        self.text.append(data)
+
+    def close(self) -> None:
+        super().close()
+        while self._open:
+            self.handle_endtag(self._open[-1])
+
+
+def excerpt_of(text: str) -> str:
+    if len(text) <= EXCERPT_MAX_CHARS:
+        return text
+    cut = text[:EXCERPT_MAX_CHARS + 1]
+    cut = cut.rsplit(' ', 1)[0] if ' ' in cut else cut[:EXCERPT_MAX_CHARS]
+    return cut.rstrip(' ,;:.!?—-') + '…'
+
+
+def render_article(content: str) -> Dict[str, Any]:
+    renderer = ArticleRenderer()
+    with span('render'):
+        renderer.feed(content)
+        renderer.close()
+    text = ' '.join(''.join(renderer.text).split())
+    word_count = len(RENDER_WORD_PATTERN.findall(text))
+    return {
+        'content_html': ''.join(renderer.out),
+        'excerpt': excerpt_of(text),
+        'word_count': word_count,
+        'reading_minutes': math.ceil(word_count / READING_WORDS_PER_MINUTE) if word_count else 0,
+        'outline': renderer.outline
+    }
+
+
+def render_params(content: Optional[str]) -> Tuple[Any, ...]:
+    if content is None:
+        return (None,) * 5
+    rendered = render_article(content)
+    return (
+        rendered['content_html'],
+        rendered['excerpt'],
+        rendered['word_count'],
+        rendered['reading_minutes'],
+        dumps(rendered['outline'])
+    )
+
+
+ARTICLE_SUMMARY_COLUMNS = 'a.id, a.title, a.slug, a.preview_text, a.excerpt, a.word_count, a.reading_minutes, a.category, a.main_image_url, a.status, a.created_at, a.updated_at, a.published_at'
+ARTICLE_FULL_COLUMNS = 'a.id, a.title, a.slug, a.preview_text, a.content_html, a.excerpt, a.word_count, a.reading_minutes, a.outline, a.category, a.main_image_url, a.status, a.author_id, a.created_at, a.updated_at, a.published_at, a.version'
+ARTICLE_EDIT_COLUMNS = f'{ARTICLE_FULL_COLUMNS}, a.content'
+ARTICLE_VIEWS = ('read', 'edit')
+ARTICLE_RETURNING_COLUMNS = (
+    'id, title, slug, content, content_html, excerpt, word_count, reading_minutes, outline, '
+    'preview_text, category, main_image_url, status, author_id, created_at, updated_at, published_at'
+)
+SEARCH_CONFIG = 'russian'
+SEARCH_HEADLINE_OPTIONS = 'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2'
+
+
+ARTICLES_CACHE_CONTROL = os.environ.get('ARTICLES_CACHE_CONTROL', 'no-cache')
+ARTICLES_PRIVATE_CACHE_CONTROL = 'private, no-store'
+
+
+ETAG_ENCODING_SUFFIX = re.compile(r'-(?:gzip|br)"$')
+
+
+def get_header(headers: Optional[Dict[str, Any]], name: str) -> Optional[str]:
+    name = name.lower()
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [ETAG_ENCODING_SUFFIX.sub('"', candidate.strip().removeprefix('W/')) for candidate in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates
+
+
+def article_etag(article_id: int, version: int, view: str = 'read') -> str:
+    if view == 'read':
+        return f'"a{article_id}-v{version}"'
+    return f'"a{article_id}-v{version}-{view}"'
+
+
+def view_suffix(view: str) -> str:
+    return '' if view == 'read' else f'_{view}'
+
+
+def list_key(req: Any) -> str:
+    params = orjson.dumps(req.model_dump(), option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha1(params).hexdigest()[:16]
+
+
+def list_etag(catalogue_version: int, req: Any) -> str:
+    return f'"l{catalogue_version}-{list_key(req)}"'
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime], published: bool) -> Dict[str, str]:
+    headers = {'ETag': etag, 'Cache-Control': ARTICLES_CACHE_CONTROL if published else ARTICLES_PRIVATE_CACHE_CONTROL}
+    if last_modified:
+        headers['Last-Modified'] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+
+def not_modified_response(validators: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        'statusCode': 304,
+        'headers': {**CORS_HEADERS, **validators},
+        'body': ''
+    }
+
+
+def encode_cursor(created_at: datetime, article_id: int) -> str:
+    raw = f'{created_at.isoformat()}|{article_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    padded = cursor + '=' * (-len(cursor) % 4)
+    created_at, article_id = base64.urlsafe_b64decode(padded).decode('utf-8').split('|', 1)
+    return datetime.fromisoformat(created_at), int(article_id)
+
+
+SYNC_XID_MAX = 2 ** 64 - 1
+SYNC_ARTICLE_ID_MAX = 2 ** 31 - 1
+
+
+def encode_sync_cursor(change_xid: int, article_id: int) -> str:
+    raw = f'{change_xid}|{article_id}'.encode('ascii')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_sync_cursor(cursor: str) -> Tuple[int, int]:
+    if cursor in ('', '0'):
+        return 0, 0
+    padded = cursor + '=' * (-len(cursor) % 4)
+    change_xid, article_id = map(int, base64.urlsafe_b64decode(padded).decode('ascii').split('|', 1))
+    if not (0 <= change_xid <= SYNC_XID_MAX and 0 <= article_id <= SYNC_ARTICLE_ID_MAX):
+        raise ValueError('sync cursor out of range')
+    return change_xid, article_id
+
+
+for view, columns in (('read', ARTICLE_FULL_COLUMNS), ('edit', ARTICLE_EDIT_COLUMNS)):
+    statements.register(
+        f'article_by_id{view_suffix(view)}',
+        f"SELECT {columns}, u.name as author_name FROM articles a JOIN users u ON a.author_id = u.id WHERE a.id = $1"
+    )
+    statements.register(
+        f'article_by_slug{view_suffix(view)}',
+        f"SELECT {columns}, u.name as author_name FROM articles a JOIN users u ON a.author_id = u.id WHERE a.slug = $1"
+    )
+statements.register('article_stamp', "SELECT id, version, updated_at, status FROM articles WHERE id = $1")
+statements.register('article_stamp_by_slug', "SELECT id, version, updated_at, status FROM articles WHERE slug = $1")
+for view, columns in (('summary', ARTICLE_SUMMARY_COLUMNS), ('full', ARTICLE_FULL_COLUMNS)):
+    statements.register(
+        f'article_changes_{view}',
+        f"""
+        WITH horizon AS (SELECT pg_snapshot_xmin(pg_current_snapshot()) AS xmin)
+        SELECT h.xmin::text AS sync_horizon, c.*
+        FROM horizon h
+        LEFT JOIN LATERAL (
+            SELECT a.change_xid::text AS change_xid, {columns}, u.name as author_name
+            FROM articles a JOIN users u ON a.author_id = u.id
+            WHERE (a.change_xid, a.id) > ($1::xid8, $2) AND a.change_xid < h.xmin
+            ORDER BY a.change_xid, a.id
+            LIMIT $3
+        ) c ON TRUE
+        """
+    )
+statements.register(
+    'article_tombstones',
+    """
+    SELECT article_id FROM article_tombstones
+    WHERE (change_xid, article_id) > ($1::xid8, $2) AND (change_xid, article_id) < ($3::xid8, $4)
+    """
+)
+statements.register(
+    'create_article',
+    f"""
+    INSERT INTO articles (title, slug, content, preview_text, category, main_image_url, status, author_id, created_at, updated_at, published_at,
+                          content_html, excerpt, word_count, reading_minutes, outline)
+    SELECT $1, {free_slug_sql('$2::text')}, $3, $4, $5, $6, $7, $8, $9::timestamp, $9::timestamp, $10::timestamp,
+           $11, $12, $13, $14, $15::jsonb
+    ON CONFLICT (slug) DO NOTHING
+    RETURNING {ARTICLE_RETURNING_COLUMNS}
+    """
+)
+statements.register(
+    'update_article',
+    f"""
+    UPDATE articles SET
+        title = COALESCE($1, title),
+        slug = CASE WHEN $2::text IS NULL THEN slug ELSE {free_slug_sql('$2::text', 'articles.id')} END,
+        content = COALESCE($3, content),
+        preview_text = COALESCE($4, preview_text),
+        category = COALESCE($5, category),
+        main_image_url = COALESCE($6, main_image_url),
+        status = COALESCE($7, status),
+        published_at = CASE WHEN $8::boolean THEN $9::timestamp ELSE published_at END,
+        content_html = COALESCE($11, content_html),
+        excerpt = COALESCE($12, excerpt),
+        word_count = COALESCE($13, word_count),
+        reading_minutes = COALESCE($14, reading_minutes),
+        outline = COALESCE($15::jsonb, outline),
+        updated_at = $9::timestamp
+    WHERE id = $10
+    RETURNING {ARTICLE_RETURNING_COLUMNS}
+    """
+)
+UPSERT_PROGRESS_SQL = """
+    INSERT INTO user_progress (user_id, article_id, progress_percent, completed, last_visited_at)
+    SELECT $1, e.article_id, e.progress_percent, e.completed, $5::timestamp
+    FROM unnest($2::integer[], $3::integer[], $4::boolean[]) AS e(article_id, progress_percent, completed)
+    ON CONFLICT (user_id, article_id)
+    DO UPDATE SET
+        progress_percent = {progress_percent},
+        completed = {completed},
+        last_visited_at = EXCLUDED.last_visited_at
+    RETURNING id, user_id, article_id, progress_percent, completed, last_visited_at
+"""
+statements.register(
+    'set_progress',
+    UPSERT_PROGRESS_SQL.format(progress_percent='EXCLUDED.progress_percent', completed='EXCLUDED.completed')
+)
+statements.register(
+    'merge_progress',
+    UPSERT_PROGRESS_SQL.format(
+        progress_percent='GREATEST(user_progress.progress_percent, EXCLUDED.progress_percent)',
+        completed='COALESCE(user_progress.completed, FALSE) OR EXCLUDED.completed'
+    )
+)
+PROGRESS_LIST_SQL = """
+    SELECT up.id, up.user_id, up.article_id, up.completed, up.progress_percent, up.last_visited_at, a.title, a.category
+    FROM user_progress up
+    JOIN articles a ON up.article_id = a.id
+    WHERE up.user_id = $1 {after}
+    ORDER BY up.last_visited_at DESC, up.article_id DESC
+    LIMIT $2
+"""
+statements.register('progress_by_user', PROGRESS_LIST_SQL.format(after=''))
+statements.register(
+    'progress_by_user_after',
+    PROGRESS_LIST_SQL.format(after='AND (up.last_visited_at, up.article_id) < ($3, $4)')
+)
+statements.register(
+    'progress_summary',
+    "SELECT category, started, completed, progress_sum FROM user_progress_summary WHERE user_id = $1 AND started > 0"
+)
+statements.register(
+    'progress_resume',
+    """
+    SELECT up.article_id, a.title, a.slug, a.category, up.progress_percent, up.last_visited_at
+    FROM user_progress up
+    JOIN articles a ON up.article_id = a.id
+    WHERE up.user_id = $1 AND NOT COALESCE(up.completed, FALSE)
+    ORDER BY up.last_visited_at DESC, up.article_id DESC
+    LIMIT 1
+    """
+)
+statements.register(
+    'stats_counters',
+    """
+    SELECT metric, dimension, value FROM stats_counters
+    WHERE metric <> 'completions_by_article' AND (dimension = '' OR value > 0)
+    UNION ALL
+    (
+        SELECT metric, dimension, value FROM stats_counters
+        WHERE metric = 'completions_by_article' AND value > 0
+        ORDER BY value DESC
+        LIMIT $1
+    )
+    """
+)
+
+
+@traced
+def handle_create_article(body_data: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
+    if user_data['role'] not in ['admin', 'editor']:
+        return json_response(403, {'error': 'Insufficient permissions'})
+    
+    req = request_models().CreateArticleRequest(**body_data)
+    now = datetime.utcnow()
+    params = (
+        req.title,
+        generate_slug(req.title),
+        req.content,
+        req.preview_text,
+        req.category,
+        req.main_image_url,
+        req.status,
+        user_data['user_id'],
+        now,
+        now if req.status == 'published' else None,
+        *render_params(req.content)
+    )
+    
+    with get_db_connection() as conn:
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        article = None
+        for _ in range(SLUG_INSERT_ATTEMPTS):
+            statements.execute(cur, 'create_article', params)
+            article = cur.fetchone()
+            if article:
+                break
+        conn.commit()
+        cur.close()
+    
+    if not article:
+        return json_response(409, {'error': 'Could not allocate a unique slug'})
+    
+    response_cache.invalidate_kind('list')
+    response_cache.invalidate_kind('search')
+    
+    return json_response(201, {'article': article})
+
+
+@traced
+def handle_update_article(article_id: int, body_data: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
+    if user_data['role'] not in ['admin', 'editor']:
+        return json_response(403, {'error': 'Insufficient permissions'})
+    
+    req = request_models().UpdateArticleRequest(**body_data)
+    
+    params = (
+        req.title,
+        generate_slug(req.title) if req.title is not None else None,
+        req.content,
+        req.preview_text,
+        req.category,
+        req.main_image_url,
+        req.status,
+        req.status == 'published',
+        datetime.utcnow(),
+        article_id,
+        *render_params(req.content)
+    )
+    
+    with get_db_connection() as conn:
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        article = None
+        slug_taken = False
+        for _ in range(SLUG_INSERT_ATTEMPTS):
+            try:
+                statements.execute(cur, 'update_article', params)
+            except pg_errors.UniqueViolation as e:
+                if e.diag.constraint_name != SLUG_CONSTRAINT:
+                    raise
+                conn.rollback()
+                slug_taken = True
+                continue
+            article = cur.fetchone()
+            slug_taken = False
+            break
+        if article:
+            conn.commit()
+        cur.close()
+    
+    if slug_taken:
+        return json_response(409, {'error': 'Could not allocate a unique slug'})
+    
+    if not article:
+        return json_response(404, {'error': 'Article not found'})
+    
+    for view in ARTICLE_VIEWS:
+        response_cache.invalidate((f'article{view_suffix(view)}', article['id']))
+        response_cache.invalidate((f'slug{view_suffix(view)}', article['slug']))
+    response_cache.invalidate_kind('list')
+    response_cache.invalidate_kind('search')
+    
+    return json_response(200, {'article': article})
+
+
+CATALOGUE_STAMP_SQL = "SELECT version, updated_at FROM content_versions WHERE name = 'articles'"
+CATEGORY_TOTALS_SQL = "SELECT category, articles AS available FROM article_facets WHERE status = 'published' AND articles > 0"
+FACETS_SQL = "SELECT status, category, articles FROM article_facets WHERE articles > 0"
+
+
+def build_list_query(req: Any, after: Optional[Tuple[datetime, int]], placeholder: Any) -> Tuple[str, List[Any]]:
+    columns = ARTICLE_FULL_COLUMNS if req.view == 'full' else ARTICLE_SUMMARY_COLUMNS
+    query = f"SELECT {columns}, u.name as author_name FROM articles a JOIN users u ON a.author_id = u.id WHERE 1=1"
+    params: List[Any] = []
+    
+    def bind(value: Any) -> str:
+        params.append(value)
+        return placeholder(len(params))
+    
+    if req.status:
+        query += f" AND a.status = {bind(req.status)}"
+    
+    if req.category:
+        query += f" AND a.category = {bind(req.category)}"
+    
+    if after:
+        query += f" AND (a.created_at, a.id) < ({bind(after[0])}, {bind(after[1])})"
+    
+    query += f" ORDER BY a.created_at DESC, a.id DESC LIMIT {bind(req.limit + 1)}"
+    return query, params
 
 
-def verify_token(token: str) -> Optional[Dict[str, Any]]:
-    jwt_secret = os.environ.get('JWT_SECRET', 'default-secret-key')
-    decoded = jwt.decode(token, jwt_secret, algorithms=['HS256'])
-    return decoded
+def cached_list_response(req: Any, stamp: Dict[str, Any], request_headers: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    validators = cache_headers(list_etag(stamp['version'], req), stamp['updated_at'], req.status == 'published')
+    if etag_matches(get_header(request_headers, 'If-None-Match'), validators['ETag']):
+        return not_modified_response(validators)
+    
+    cached = response_cache.get(('list', list_key(req)), stamp['version']) if req.status == 'published' else None
+    if cached:
+        body, validators = cached
+        return build_response(200, body, validators)
+    return None
 
 
-def generate_slug(title: str) -> str:
-    slug = re.sub(r'[^\w\s-]', '', title.lower())
-    slug = re.sub(r'[-\s]+', '-', slug)
-    return slug[:500]
+def article_list_response(req: Any, articles: List[Dict[str, Any]], stamp: Dict[str, Any]) -> Dict[str, Any]:
+    validators = cache_headers(list_etag(stamp['version'], req), stamp['updated_at'], req.status == 'published')
+    next_cursor = None
+    if len(articles) > req.limit:
+        articles = articles[:req.limit]
+        last = articles[-1]
+        next_cursor = encode_cursor(last['created_at'], last['id'])
+    
+    body = dumps({'articles': articles, 'next_cursor': next_cursor})
+    if req.status == 'published':
+        response_cache.put(('list', list_key(req)), stamp['version'], body, validators)
+    
+    return build_response(200, body, validators)
 
 
-def handle_create_article(body_data: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
-    if user_data['role'] not in ['admin', 'editor']:
-        return {
-            'statusCode': 403,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Insufficient permissions'})
-        }
+@traced
+def handle_get_articles(query_params: Dict[str, Any], request_headers: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        req = request_models().ListArticlesQuery(**query_params)
+        after = decode_cursor(req.cursor) if req.cursor else None
+    except ValueError:
+        return json_response(400, {'error': 'Invalid query parameters'})
     
-    req = CreateArticleRequest(**body_data)
-    slug = generate_slug(req.title)
+    query, params = build_list_query(req, after, lambda n: '%s')
     
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    with get_read_connection() as conn:
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        cur.execute(CATALOGUE_STAMP_SQL)
+        stamp = cur.fetchone()
+        early = cached_list_response(req, stamp, request_headers)
+        if early:
+            cur.close()
+            return early
+        
+        cur.execute(query, params)
+        articles = cur.fetchall()
+        cur.close()
     
-    published_at = datetime.utcnow() if req.status == 'published' else None
+    return article_list_response(req, articles, stamp)
+
+
+def facets_etag(catalogue_version: int) -> str:
+    return f'"f{catalogue_version}"'
+
+
+def cached_facets_response(stamp: Dict[str, Any], request_headers: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    validators = cache_headers(facets_etag(stamp['version']), stamp['updated_at'], True)
+    if etag_matches(get_header(request_headers, 'If-None-Match'), validators['ETag']):
+        return not_modified_response(validators)
     
-    cur.execute(
-        """
-        INSERT INTO articles (title, slug, content, preview_text, category, main_image_url, status, author_id, created_at, updated_at, published_at)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        RETURNING id, title, slug, content, preview_text, category, main_image_url, status, author_id, created_at, updated_at, published_at
-        """,
-        (req.title, slug, req.content, req.preview_text, req.category, req.main_image_url, req.status, user_data['user_id'], datetime.utcnow(), datetime.utcnow(), published_at)
-    )
+    cached = response_cache.get(('facets', None), stamp['version'])
+    if cached:
+        body, validators = cached
+        return build_response(200, body, validators)
+    return None
+
+
+def facets_response(rows: List[Dict[str, Any]], stamp: Dict[str, Any]) -> Dict[str, Any]:
+    validators = cache_headers(facets_etag(stamp['version']), stamp['updated_at'], True)
+    categories: Dict[str, int] = {}
+    statuses: Dict[str, int] = {}
+    for row in sorted(rows, key=lambda row: (row['status'], row['category'])):
+        statuses[row['status']] = statuses.get(row['status'], 0) + row['articles']
+        if row['status'] == 'published':
+            categories[row['category']] = row['articles']
     
-    article = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
+    body = dumps({'facets': {'published': statuses.get('published', 0), 'categories': categories, 'statuses': statuses}})
+    response_cache.put(('facets', None), stamp['version'], body, validators)
+    return build_response(200, body, validators)
+
+
+@traced
+def handle_get_facets(request_headers: Dict[str, Any]) -> Dict[str, Any]:
+    with get_read_connection() as conn:
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        cur.execute(CATALOGUE_STAMP_SQL)
+        stamp = cur.fetchone()
+        early = cached_facets_response(stamp, request_headers)
+        if early:
+            cur.close()
+            return early
+        
+        cur.execute(FACETS_SQL)
+        rows = cur.fetchall()
+        cur.close()
     
-    return {
-        'statusCode': 201,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({'article': dict(article)}, default=str)
-    }
+    return facets_response(rows, stamp)
 
 
-def handle_update_article(article_id: int, body_data: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
-    if user_data['role'] not in ['admin', 'editor']:
-        return {
-            'statusCode': 403,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Insufficient permissions'})
-        }
+@traced
+def handle_sync_articles(query_params: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        req = request_models().SyncArticlesQuery(**query_params)
+        after = decode_sync_cursor(req.since)
+    except ValueError:
+        return json_response(400, {'error': 'Invalid query parameters'})
     
-    req = UpdateArticleRequest(**body_data)
+    with get_read_connection() as conn:
+        conn.set_session(readonly=True)
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        statements.execute(cur, f'article_changes_{req.view}', (str(after[0]), after[1], req.limit + 1))
+        rows = cur.fetchall()
+        horizon = int(rows[0]['sync_horizon'])
+        changes = [row for row in rows if row['id'] is not None]
+        
+        has_more = len(changes) > req.limit
+        if has_more:
+            changes = changes[:req.limit]
+            last = (int(changes[-1]['change_xid']), changes[-1]['id'])
+            next_since, upper = last, (last[0], last[1] + 1)
+        else:
+            next_since = upper = max(after, (horizon, 0))
+        
+        statements.execute(cur, 'article_tombstones', (str(after[0]), after[1], str(upper[0]), upper[1]))
+        removed = [row['article_id'] for row in cur.fetchall()]
+        conn.commit()
+        cur.close()
     
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    articles = []
+    for row in changes:
+        article = {key: value for key, value in row.items() if key not in ('sync_horizon', 'change_xid')}
+        if (req.status and article['status'] != req.status) or (req.category and article['category'] != req.category):
+            removed.append(article['id'])
+        else:
+            articles.append(article)
     
-    updates = []
-    values = []
+    return json_response(200, {
+        'articles': articles,
+        'removed': sorted(removed),
+        'next_since': encode_sync_cursor(*next_since),
+        'has_more': has_more
+    })
+
+
+def cached_article_response(cache_key: Tuple[str, Any], stamp: Optional[Dict[str, Any]],
+                            if_none_match: Optional[str], view: str) -> Optional[Dict[str, Any]]:
+    if not stamp:
+        return None
+    validators = cache_headers(article_etag(stamp['id'], stamp['version'], view), stamp['updated_at'], stamp['status'] == 'published')
+    if etag_matches(if_none_match, validators['ETag']):
+        return not_modified_response(validators)
+    cached = response_cache.get(cache_key, stamp['version'])
+    if cached:
+        body, validators = cached
+        return build_response(200, body, validators)
+    return None
+
+
+def article_response(cache_key: Tuple[str, Any], article: Optional[Dict[str, Any]], view: str) -> Dict[str, Any]:
+    if not article:
+        return json_response(404, {'error': 'Article not found'})
     
-    if req.title is not None:
-        updates.append("title = %s")
-        values.append(req.title)
-        updates.append("slug = %s")
-        values.append(generate_slug(req.title))
+    validators = cache_headers(article_etag(article['id'], article['version'], view), article['updated_at'], article['status'] == 'published')
+    body = dumps({'article': article})
+    if article['status'] == 'published':
+        response_cache.put(cache_key, article['version'], body, validators)
     
-    if req.content is not None:
-        updates.append("content = %s")
-        values.append(req.content)
+    return build_response(200, body, validators)
+
+
+def serve_article(request_headers: Dict[str, Any], kind: str, stamp_statement: str,
+                  article_statement: str, lookup: Any, view: str) -> Dict[str, Any]:
+    if view not in ARTICLE_VIEWS:
+        return json_response(400, {'error': 'Invalid query parameters'})
+    if_none_match = get_header(request_headers, 'If-None-Match')
+    cache_key = (f'{kind}{view_suffix(view)}', lookup)
+    article_statement = f'{article_statement}{view_suffix(view)}'
     
-    if req.preview_text is not None:
-        updates.append("preview_text = %s")
-        values.append(req.preview_text)
+    with get_read_connection() as conn:
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        
+        if if_none_match or response_cache.contains(cache_key):
+            statements.execute(cur, stamp_statement, (lookup,))
+            early = cached_article_response(cache_key, cur.fetchone(), if_none_match, view)
+            if early:
+                cur.close()
+                return early
+        
+        statements.execute(cur, article_statement, (lookup,))
+        article = cur.fetchone()
+        cur.close()
     
-    if req.category is not None:
-        updates.append("category = %s")
-        values.append(req.category)
+    return article_response(cache_key, article, view)
+
+
+@traced
+def handle_get_article(article_id: int, request_headers: Dict[str, Any], view: str = 'read') -> Dict[str, Any]:
+    return serve_article(request_headers, 'article', 'article_stamp', 'article_by_id', article_id, view)
+
+
+@traced
+def handle_get_article_by_slug(slug: str, request_headers: Dict[str, Any], view: str = 'read') -> Dict[str, Any]:
+    if len(slug) > 500:
+        return json_response(404, {'error': 'Article not found'})
+    return serve_article(request_headers, 'slug', 'article_stamp_by_slug', 'article_by_slug', slug, view)
+
+
+def coalesce_progress(entries: List[Any]) -> List[Any]:
+    merged: Dict[int, Any] = {}
+    for entry in entries:
+        current = merged.get(entry.article_id)
+        if current is None:
+            merged[entry.article_id] = entry
+            continue
+        merged[entry.article_id] = request_models().UpdateProgressRequest(
+            article_id=entry.article_id,
+            progress_percent=max(current.progress_percent, entry.progress_percent),
+            completed=current.completed or entry.completed
+        )
+    return [merged[article_id] for article_id in sorted(merged)]
+
+
+def upsert_progress(cur: Any, user_id: int, entries: List[Any], merge: bool) -> List[Dict[str, Any]]:
+    statements.execute(cur, 'merge_progress' if merge else 'set_progress', (
+        user_id,
+        [e.article_id for e in entries],
+        [e.progress_percent for e in entries],
+        [e.completed for e in entries],
+        datetime.utcnow()
+    ))
+    return cur.fetchall()
+
+
+@traced
+def handle_search_articles(query_params: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        req = request_models().SearchArticlesQuery(**query_params)
+    except ValueError:
+        return json_response(400, {'error': 'Invalid query parameters'})
     
-    if req.main_image_url is not None:
-        updates.append("main_image_url = %s")
-        values.append(req.main_image_url)
+    filters = "a.search_vector @@ q.query AND a.status = %s"
+    params: List[Any] = [req.q, req.status]
+    if req.category:
+        filters += " AND a.category = %s"
+        params.append(req.category)
+    params.extend([req.limit + 1, req.offset])
     
-    if req.status is not None:
-        updates.append("status = %s")
-        values.append(req.status)
-        if req.status == 'published':
-            updates.append("published_at = %s")
-            values.append(datetime.utcnow())
+    with get_read_connection() as conn:
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        cur.execute("SELECT version FROM content_versions WHERE name = 'articles'")
+        version = cur.fetchone()['version']
+        
+        cache_key = ('search', list_key(req))
+        cached = response_cache.get(cache_key, version) if req.status == 'published' else None
+        if cached:
+            cur.close()
+            return build_response(200, cached[0])
+        
+        cur.execute(
+            f"""
+            WITH q AS (SELECT websearch_to_tsquery('{SEARCH_CONFIG}', %s) AS query),
+            ranked AS (
+                SELECT a.id, ts_rank(a.search_vector, q.query) AS rank, q.query
+                FROM articles a, q
+                WHERE {filters}
+                ORDER BY rank DESC, a.id DESC
+                LIMIT %s OFFSET %s
+            )
+            SELECT {ARTICLE_SUMMARY_COLUMNS}, u.name as author_name, r.rank,
+                ts_headline('{SEARCH_CONFIG}', regexp_replace(a.content, '<[^>]+>', ' ', 'g'), r.query, '{SEARCH_HEADLINE_OPTIONS}') AS snippet
+            FROM ranked r
+            JOIN articles a ON a.id = r.id
+            JOIN users u ON a.author_id = u.id
+            ORDER BY r.rank DESC, a.id DESC
+            """,
+            params
+        )
+        results = cur.fetchall()
+        cur.close()
     
-    updates.append("updated_at = %s")
-    values.append(datetime.utcnow())
+    next_offset = None
+    if len(results) > req.limit:
+        results = results[:req.limit]
+        next_offset = req.offset + req.limit
     
-    values.append(article_id)
+    body = dumps({'results': results, 'next_offset': next_offset})
+    if req.status == 'published':
+        response_cache.put(cache_key, version, body, {})
     
-    query = f"UPDATE articles SET {', '.join(updates)} WHERE id = %s RETURNING id, title, slug, content, preview_text, category, main_image_url, status, author_id, created_at, updated_at, published_at"
+    return build_response(200, body)
+
+
+@traced
+def handle_update_progress(body_data: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
+    req = request_models().UpdateProgressRequest(**body_data)
     
-    cur.execute(query, values)
-    article = cur.fetchone()
+    with get_db_connection() as conn:
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        progress = upsert_progress(cur, user_data['user_id'], [req], merge=False)[0]
+        conn.commit()
+        cur.close()
     
-    if not article:
+    return json_response(200, {'progress': progress})
+
+
+@traced
+def handle_update_progress_batch(body_data: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
+    req = request_models().UpdateProgressBatchRequest(**body_data)
+    entries = coalesce_progress(req.entries)
+    
+    with get_db_connection() as conn:
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        progress_list = upsert_progress(cur, user_data['user_id'], entries, merge=True)
+        conn.commit()
         cur.close()
-        conn.close()
-        return {
-            'statusCode': 404,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Article not found'})
+    
+    return json_response(200, {'progress': progress_list})
+
+
+def progress_list_statement(req: Any, user_id: int,
+                            after: Optional[Tuple[datetime, int]]) -> Tuple[str, Tuple[Any, ...]]:
+    if after:
+        return 'progress_by_user_after', (user_id, req.limit + 1, after[0], after[1])
+    return 'progress_by_user', (user_id, req.limit + 1)
+
+
+def progress_list_response(req: Any, progress_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+    next_cursor = None
+    if len(progress_list) > req.limit:
+        progress_list = progress_list[:req.limit]
+        last = progress_list[-1]
+        next_cursor = encode_cursor(last['last_visited_at'], last['article_id'])
+    
+    return json_response(200, {'progress': progress_list, 'next_cursor': next_cursor})
+
+
+def cached_category_totals(version: int) -> Optional[Dict[str, int]]:
+    cached = response_cache.get(('category_totals', None), version)
+    return orjson.loads(cached[0]) if cached else None
+
+
+def store_category_totals(version: int, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    totals = {row['category']: row['available'] for row in rows}
+    response_cache.put(('category_totals', None), version, dumps(totals), {})
+    return totals
+
+
+def completion_percent(completed: int, available: int) -> float:
+    denominator = max(available, completed)
+    return round(100 * completed / denominator, 1) if denominator else 0.0
+
+
+def progress_summary_response(rows: List[Dict[str, Any]], totals: Dict[str, int],
+                              resume: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    by_category = {row['category']: row for row in rows}
+    categories = []
+    overall = {'available': 0, 'started': 0, 'completed': 0, 'progress_sum': 0}
+    for category in sorted(set(totals) | set(by_category)):
+        row = by_category.get(category, {})
+        entry = {
+            'available': totals.get(category, 0),
+            'started': row.get('started', 0),
+            'completed': row.get('completed', 0),
+            'progress_sum': row.get('progress_sum', 0)
         }
+        for key, value in entry.items():
+            overall[key] += value
+        categories.append({
+            'category': category,
+            'available': entry['available'],
+            'started': entry['started'],
+            'completed': entry['completed'],
+            'completion_percent': completion_percent(entry['completed'], entry['available']),
+            'average_progress': round(entry['progress_sum'] / entry['started'], 1) if entry['started'] else 0.0
+        })
+    
+    return json_response(200, {
+        'summary': {
+            'available': overall['available'],
+            'started': overall['started'],
+            'completed': overall['completed'],
+            'completion_percent': completion_percent(overall['completed'], overall['available']),
+            'average_progress': round(overall['progress_sum'] / overall['started'], 1) if overall['started'] else 0.0,
+            'categories': categories,
+            'resume': resume
+        }
+    })
+
+
+@traced
+def handle_get_user_progress(query_params: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        req = request_models().ProgressQuery(**query_params)
+        after = decode_cursor(req.cursor) if req.cursor else None
+    except ValueError:
+        return json_response(400, {'error': 'Invalid query parameters'})
     
-    conn.commit()
-    cur.close()
-    conn.close()
+    user_id = user_data['user_id']
+    with get_read_connection() as conn:
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        if req.view == 'list':
+            statements.execute(cur, *progress_list_statement(req, user_id, after))
+            progress_list = cur.fetchall()
+            cur.close()
+            return progress_list_response(req, progress_list)
+        
+        conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        cur.execute(CATALOGUE_STAMP_SQL)
+        version = cur.fetchone()['version']
+        totals = cached_category_totals(version)
+        if totals is None:
+            cur.execute(CATEGORY_TOTALS_SQL)
+            totals = store_category_totals(version, cur.fetchall())
+        statements.execute(cur, 'progress_summary', (user_id,))
+        rows = cur.fetchall()
+        statements.execute(cur, 'progress_resume', (user_id,))
+        resume = cur.fetchone()
+        conn.commit()
+        cur.close()
     
-    return {
-        'statusCode': 200,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({'article': dict(article)}, default=str)
+    return progress_summary_response(rows, totals, resume)
+
+
+STATS_TOTAL_METRICS = ('total_articles', 'total_users', 'subscribers')
+STATS_TOP_COMPLETIONS = int(os.environ.get('STATS_TOP_COMPLETIONS', '20'))
+
+
+@traced
+def handle_get_stats(user_data: Dict[str, Any]) -> Dict[str, Any]:
+    if user_data['role'] not in ['admin', 'editor']:
+        return json_response(403, {'error': 'Insufficient permissions'})
+    
+    with get_read_connection() as conn:
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        statements.execute(cur, 'stats_counters', (STATS_TOP_COMPLETIONS,))
+        counters = cur.fetchall()
+        cur.close()
+    
+    return json_response(200, {'stats': stats_payload(counters)})
+
+
+def stats_payload(counters: List[Dict[str, Any]]) -> Dict[str, Any]:
+    stats: Dict[str, Any] = {
+        'total_articles': 0,
+        'total_users': 0,
+        'subscribers': 0,
+        'articles_by_status': {},
+        'articles_by_category': {},
+        'completions_by_article': {}
     }
+    for row in counters:
+        if row['metric'] in STATS_TOTAL_METRICS:
+            stats[row['metric']] = row['value']
+        elif row['metric'] in stats:
+            stats[row['metric']][row['dimension']] = row['value']
+    return stats
+
+
+@traced
+def handle_reconcile_stats(user_data: Dict[str, Any]) -> Dict[str, Any]:
+    if user_data['role'] != 'admin':
+        return json_response(403, {'error': 'Insufficient permissions'})
+    
+    with get_db_connection() as conn:
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        cur.execute("SELECT stats_reconcile() + user_progress_summary_reconcile() + article_facets_reconcile() AS corrected")
+        corrected = cur.fetchone()['corrected']
+        conn.commit()
+        cur.close()
+    
+    return json_response(200, {'corrected': corrected})
+
+
+@traced
+def handle_get_metrics(user_data: Dict[str, Any]) -> Dict[str, Any]:
+    if user_data['role'] != 'admin':
+        return json_response(403, {'error': 'Insufficient permissions'})
+    
+    return json_response(200, {
+        'metrics': {
+            'db_pool': get_db_pool().stats(),
+            'read_router': read_router.stats(),
+            'statements': statements.stats(),
+            'response_cache': response_cache.stats(),
+            'token_cache': token_cache.stats()
+        }
+    })
+
+
+EXPORT_DIR = os.environ.get('EXPORT_DIR', '/tmp/exports')
+EXPORT_ITERSIZE = int(os.environ.get('EXPORT_ITERSIZE', '2000'))
+EXPORT_CHUNK_BYTES = int(os.environ.get('EXPORT_CHUNK_BYTES', str(256 * 1024)))
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+EXPORT_DATASETS = {
+    'articles': f"SELECT {ARTICLE_EDIT_COLUMNS}, u.name as author_name FROM articles a JOIN users u ON a.author_id = u.id ORDER BY a.id",
+    'progress': "SELECT user_id, article_id, progress_percent, completed, last_visited_at FROM user_progress ORDER BY user_id, article_id"
+}
+
+
+def csv_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return dumps(value)
+    return value
+
+
+class ExportStream:
+    '''
+    Iterates a dataset as encoded chunks of about EXPORT_CHUNK_BYTES. Rows
+    come from a named server-side cursor, so only EXPORT_ITERSIZE of them
+    are held in memory at any time regardless of table size.
+    '''
+
+    def __init__(self, dataset: str, fmt: str):
+        if dataset not in EXPORT_DATASETS or fmt not in EXPORT_FORMATS:
+            raise ValueError(f'Unsupported export {dataset}/{fmt}')
+        self.dataset = dataset
+        self.fmt = fmt
+        self.rows = 0
+        self.bytes = 0
+
+    def __iter__(self):
+        with get_read_connection() as conn:
+            conn.set_session(readonly=True)
+            cur = conn.cursor(name=f'export_{self.dataset}')
+            cur.itersize = EXPORT_ITERSIZE
+            cur.execute(EXPORT_DATASETS[self.dataset])
+            try:
+                encode = self._ndjson_chunks if self.fmt == 'ndjson' else self._csv_chunks
+                for chunk in encode(cur):
+                    self.bytes += len(chunk)
+                    yield chunk
+            finally:
+                cur.close()
+                conn.rollback()
+
+    def _ndjson_chunks(self, cur: Any):
+        buffer = bytearray()
+        columns = None
+        for row in cur:
+            if columns is None:
+                columns = [column.name for column in cur.description]
+            buffer += orjson.dumps(dict(zip(columns, row)), option=orjson.OPT_NAIVE_UTC)
+            buffer += b'\n'
+            self.rows += 1
+            if len(buffer) >= EXPORT_CHUNK_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+    def _csv_chunks(self, cur: Any):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        header_written = False
+        for row in cur:
+            if not header_written:
+                writer.writerow([column.name for column in cur.description])
+                header_written = True
+            writer.writerow([csv_value(value) for value in row])
+            self.rows += 1
+            if buffer.tell() >= EXPORT_CHUNK_BYTES:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+
+def write_export(stream: ExportStream) -> str:
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    name = f'{stream.dataset}-{datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")}.{stream.fmt}'
+    path = os.path.join(EXPORT_DIR, name)
+    with open(path + '.part', 'wb') as f:
+        for chunk in stream:
+            f.write(chunk)
+    os.replace(path + '.part', path)
+    return path
+
+
+@traced
+def handle_export(body_data: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
+    if user_data['role'] != 'admin':
+        return json_response(403, {'error': 'Insufficient permissions'})
+    
+    try:
+        stream = ExportStream(body_data.get('dataset', 'articles'), body_data.get('format', 'ndjson'))
+    except ValueError as e:
+        return json_response(400, {'error': str(e)})
+    
+    path = write_export(stream)
+    
+    return json_response(200, {
+        'export': {
+            'dataset': stream.dataset,
+            'format': stream.fmt,
+            'content_type': EXPORT_FORMATS[stream.fmt],
+            'rows': stream.rows,
+            'bytes': stream.bytes,
+            'location': path
+        }
+    })
+
+
+IMPORT_MAX_ROWS = int(os.environ.get('IMPORT_MAX_ROWS', '5000'))
+SLUG_ALLOCATION_ROUNDS = 6
+IMPORT_COLUMNS = (
+    'row_no', 'title', 'slug', 'content', 'preview_text', 'category', 'main_image_url', 'status',
+    'content_html', 'excerpt', 'word_count', 'reading_minutes', 'outline'
+)
+COPY_TEXT_SPECIAL = re.compile(r'[\\\t\n\r]')
+COPY_TEXT_ESCAPES = (('\\', '\\\\'), ('\t', '\\t'), ('\n', '\\n'), ('\r', '\\r'))
 
 
-def handle_get_articles(query_params: Dict[str, Any]) -> Dict[str, Any]:
-    status = query_params.get('status')
-    category = query_params.get('category')
+def copy_text_value(value: Any) -> str:
+    if value is None:
+        return '\\N'
+    text = str(value)
+    if COPY_TEXT_SPECIAL.search(text):
+        for char, escaped in COPY_TEXT_ESCAPES:
+            text = text.replace(char, escaped)
+    return text
+
+
+def validation_message(error: Exception) -> str:
+    errors = getattr(error, 'errors', None)
+    if not callable(errors):
+        return str(error)
+    return '; '.join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}" for item in errors()
+    )
+
+
+def slug_candidate(base: str, n: int) -> str:
+    return base if n == 1 else f'{base}-{n}'
+
+
+def assign_slugs(bases: List[str], probed: Dict[str, int], taken: set, fallback: bool) -> Tuple[List[str], set]:
+    taken = set(taken)
+    next_probe: Dict[str, int] = {}
+    exhausted = set()
+    slugs = []
+    for base in bases:
+        n = next_probe.get(base, 1)
+        while n <= probed[base] and slug_candidate(base, n) in taken:
+            n += 1
+        if n <= probed[base]:
+            candidate = slug_candidate(base, n)
+        elif fallback:
+            candidate = f'{base}-{random.getrandbits(32):08x}'
+        else:
+            exhausted.add(base)
+            continue
+        next_probe[base] = n + 1
+        taken.add(candidate)
+        slugs.append(candidate)
+    return slugs, exhausted
+
+
+def allocate_slugs(cur: Any, bases: List[str]) -> List[str]:
+    probed = {base: 0 for base in bases}
+    limits = {base: count + SLUG_PROBES for base, count in Counter(bases).items()}
+    taken: set = set()
+    for attempt in range(SLUG_ALLOCATION_ROUNDS):
+        candidates = [
+            slug_candidate(base, n)
+            for base, limit in limits.items()
+            for n in range(probed[base] + 1, limit + 1)
+        ]
+        cur.execute("SELECT slug FROM articles WHERE slug = ANY(%s)", (candidates,))
+        taken.update(row[0] for row in cur.fetchall())
+        probed.update(limits)
+        
+        slugs, exhausted = assign_slugs(bases, probed, taken, attempt == SLUG_ALLOCATION_ROUNDS - 1)
+        if not exhausted:
+            return slugs
+        limits = {base: probed[base] * 2 for base in exhausted}
+    return slugs
+
+
+def import_articles(rows: List[Any], author_id: int, strict: bool = False) -> Dict[str, Any]:
+    model = request_models().CreateArticleRequest
+    valid = []
+    errors = []
+    for row_no, row in enumerate(rows):
+        try:
+            valid.append((row_no, model.model_validate(row)))
+        except ValueError as e:
+            errors.append({'row': row_no, 'error': validation_message(e)})
     
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    if not valid or (strict and errors):
+        return {'imported': [], 'errors': errors}
     
-    query = "SELECT a.*, u.name as author_name FROM articles a JOIN users u ON a.author_id = u.id WHERE 1=1"
-    params = []
+    now = datetime.utcnow()
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        slugs = allocate_slugs(cur, [generate_slug(req.title) for _, req in valid])
     
-    if status:
-        query += " AND a.status = %s"
-        params.append(status)
+        buffer = io.StringIO()
+        for (row_no, req), slug in zip(valid, slugs):
+            values = (row_no, req.title, slug, req.content, req.preview_text, req.category, req.main_image_url, req.status,
+                      *render_params(req.content))
+            buffer.write('\t'.join(copy_text_value(value) for value in values))
+            buffer.write('\n')
+        buffer.seek(0)
     
-    if category:
-        query += " AND a.category = %s"
-        params.append(category)
+        cur.execute("""
+            CREATE TEMP TABLE article_import (
+                row_no INTEGER, title TEXT, slug TEXT, content TEXT, preview_text TEXT,
+                category TEXT, main_image_url TEXT, status TEXT,
+                content_html TEXT, excerpt TEXT, word_count INTEGER, reading_minutes INTEGER, outline JSONB
+            ) ON COMMIT DROP
+        """)
+        with span('copy'):
+            cur.copy_expert(f"COPY article_import ({', '.join(IMPORT_COLUMNS)}) FROM STDIN", buffer)
+        cur.execute("""
+            INSERT INTO articles (title, slug, content, preview_text, category, main_image_url, status, author_id, created_at, updated_at, published_at,
+                                  content_html, excerpt, word_count, reading_minutes, outline)
+            SELECT title, slug, content, preview_text, category, main_image_url, status, %(author_id)s, %(now)s, %(now)s,
+                   CASE WHEN status = 'published' THEN %(now)s::timestamp END,
+                   content_html, excerpt, word_count, reading_minutes, outline
+            FROM article_import
+            ORDER BY row_no
+            ON CONFLICT (slug) DO NOTHING
+            RETURNING id, slug
+        """, {'author_id': author_id, 'now': now})
+        inserted = {slug: article_id for article_id, slug in cur.fetchall()}
     
-    query += " ORDER BY a.created_at DESC"
+        imported = []
+        for (row_no, _), slug in zip(valid, slugs):
+            if slug in inserted:
+                imported.append({'row': row_no, 'id': inserted[slug], 'slug': slug})
+            else:
+                errors.append({'row': row_no, 'error': f'slug: {slug} was taken by a concurrent write'})
     
-    cur.execute(query, params)
-    articles = cur.fetchall()
-    cur.close()
-    conn.close()
+        if strict and errors:
+            conn.rollback()
+            imported = []
+        else:
+            conn.commit()
+        cur.close()
     
-    return {
-        'statusCode': 200,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({'articles': [dict(a) for a in articles]}, default=str)
-    }
+    errors.sort(key=lambda item: item['row'])
+    return {'imported': imported, 'errors': errors}
 
 
-def handle_get_article(article_id: int) -> Dict[str, Any]:
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+@traced
+def handle_import_articles(body_data: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
+    if user_data['role'] != 'admin':
+        return json_response(403, {'error': 'Insufficient permissions'})
     
-    cur.execute(
-        "SELECT a.*, u.name as author_name FROM articles a JOIN users u ON a.author_id = u.id WHERE a.id = %s",
-        (article_id,)
-    )
-    article = cur.fetchone()
-    cur.close()
-    conn.close()
+    rows = body_data.get('articles')
+    if not isinstance(rows, list) or not rows or len(rows) > IMPORT_MAX_ROWS:
+        return json_response(400, {'error': f'articles must be a list of 1 to {IMPORT_MAX_ROWS} rows'})
     
-    if not article:
-        return {
-            'statusCode': 404,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Article not found'})
-        }
+    result = import_articles(rows, user_data['user_id'], bool(body_data.get('strict')))
     
-    return {
-        'statusCode': 200,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({'article': dict(article)}, default=str)
-    }
+    if result['imported']:
+        response_cache.invalidate_kind('list')
+        response_cache.invalidate_kind('search')
+    
+    return json_response(201 if result['imported'] else 400, result)
 
 
-def handle_update_progress(body_data: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
-    req = UpdateProgressRequest(**body_data)
+def warmup() -> Dict[str, float]:
+    timings: Dict[str, float] = {}
+    
+    started = time.perf_counter()
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT 1")
+        cur.close()
+    timings['db_pool'] = time.perf_counter() - started
     
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    started = time.perf_counter()
+    jwt.load()
+    timings['jwt'] = time.perf_counter() - started
     
-    cur.execute(
-        """
-        INSERT INTO user_progress (user_id, article_id, progress_percent, completed, last_visited_at)
-        VALUES (%s, %s, %s, %s, %s)
-        ON CONFLICT (user_id, article_id) 
-        DO UPDATE SET progress_percent = %s, completed = %s, last_visited_at = %s
-        RETURNING id, user_id, article_id, progress_percent, completed, last_visited_at
-        """,
-        (user_data['user_id'], req.article_id, req.progress_percent, req.completed, datetime.utcnow(), req.progress_percent, req.completed, datetime.utcnow())
-    )
+    started = time.perf_counter()
+    for model in vars(request_models()).values():
+        model.model_rebuild()
+    timings['models'] = time.perf_counter() - started
     
-    progress = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
+    started = time.perf_counter()
+    handle_get_articles({'status': 'published'}, {})
+    timings['published_list'] = time.perf_counter() - started
     
-    return {
-        'statusCode': 200,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({'progress': dict(progress)}, default=str)
-    }
+    return {name: round(seconds * 1000, 2) for name, seconds in timings.items()}
 
 
-def handle_get_user_progress(user_data: Dict[str, Any]) -> Dict[str, Any]:
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+@traced
+def handle_warmup(user_data: Dict[str, Any]) -> Dict[str, Any]:
+    if user_data['role'] != 'admin':
+        return json_response(403, {'error': 'Insufficient permissions'})
     
-    cur.execute(
-        """
-        SELECT up.*, a.title, a.category 
-        FROM user_progress up 
-        JOIN articles a ON up.article_id = a.id 
-        WHERE up.user_id = %s
-        ORDER BY up.last_visited_at DESC
-        """,
-        (user_data['user_id'],)
-    )
+    return json_response(200, {'warmup_ms': warmup()})
+
+
+BATCH_FORWARDED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control')
+
+
+class SnapshotConnection:
+    '''
+    The one read-only transaction a batch runs its items in. Handlers end
+    their own transactions with commit/rollback/set_session, which would
+    drop the shared snapshot, so those calls are ignored here.
+    '''
+
+    def __init__(self, conn: Any):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return self._conn.cursor(*args, **kwargs)
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def set_session(self, **kwargs) -> None:
+        pass
+
+
+def run_batch_item(cur: Any, item: Any, user_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    cur.execute('SAVEPOINT batch_item')
+    try:
+        func, args = route_get(item.query, item.headers, user_data)
+        response = func(*args)
+    except ValueError:
+        cur.execute('ROLLBACK TO SAVEPOINT batch_item')
+        return json_response(400, {'error': 'Invalid query parameters'})
+    except Exception as e:
+        cur.execute('ROLLBACK TO SAVEPOINT batch_item')
+        return json_response(500, {'error': type(e).__name__})
+    return response
+
+
+@traced
+def handle_batch(body_data: Dict[str, Any], request_headers: Dict[str, Any],
+                 user_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    try:
+        req = request_models().BatchRequest(**body_data)
+    except ValueError:
+        return json_response(400, {'error': 'Invalid batch request'})
     
-    progress_list = cur.fetchall()
-    cur.close()
-    conn.close()
+    results = []
+    with get_read_connection() as conn:
+        conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        cur = conn.cursor()
+        token = batch_connection.set(SnapshotConnection(conn))
+        try:
+            for item in req.requests:
+                response = run_batch_item(cur, item, user_data)
+                headers = {name: response['headers'][name] for name in BATCH_FORWARDED_HEADERS if name in response['headers']}
+                results.append(
+                    f'{{"status":{response["statusCode"]},"headers":{dumps(headers)},"body":{response["body"] or "null"}}}'
+                )
+        finally:
+            batch_connection.reset(token)
+            cur.close()
+            conn.rollback()
     
-    return {
-        'statusCode': 200,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({'progress': [dict(p) for p in progress_list]}, default=str)
-    }
+    return build_response(200, '{"results":[' + ','.join(results) + ']}')
 
 
-def handle_get_stats(user_data: Dict[str, Any]) -> Dict[str, Any]:
-    if user_data['role'] not in ['admin', 'editor']:
-        return {
-            'statusCode': 403,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Insufficient permissions'})
-        }
+@traced_async
+async def async_handle_get_articles(query_params: Dict[str, Any], request_headers: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        req = request_models().ListArticlesQuery(**query_params)
+        after = decode_cursor(req.cursor) if req.cursor else None
+    except ValueError:
+        return json_response(400, {'error': 'Invalid query parameters'})
     
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    query, params = build_list_query(req, after, lambda n: f'${n}')
     
-    cur.execute("SELECT COUNT(*) as total_articles FROM articles")
-    articles_count = cur.fetchone()['total_articles']
+    async with read_router.async_database(read_primary.get()) as db:
+        stamp = await async_fetchrow(db, CATALOGUE_STAMP_SQL)
+        early = cached_list_response(req, stamp, request_headers)
+        if early:
+            return early
+        articles = await async_fetch(db, query, *params)
     
-    cur.execute("SELECT COUNT(*) as total_users FROM users")
-    users_count = cur.fetchone()['total_users']
+    return article_list_response(req, articles, stamp)
+
+
+@traced_async
+async def async_handle_get_facets(request_headers: Dict[str, Any]) -> Dict[str, Any]:
+    async with read_router.async_database(read_primary.get()) as db:
+        stamp = await async_fetchrow(db, CATALOGUE_STAMP_SQL)
+        early = cached_facets_response(stamp, request_headers)
+        if early:
+            return early
+        rows = await async_fetch(db, FACETS_SQL)
     
-    cur.execute("SELECT COUNT(*) as subscribers FROM users WHERE subscription_date IS NOT NULL")
-    subscribers_count = cur.fetchone()['subscribers']
+    return facets_response(rows, stamp)
+
+
+async def async_serve_article(request_headers: Dict[str, Any], kind: str, stamp_statement: str,
+                              article_statement: str, lookup: Any, view: str) -> Dict[str, Any]:
+    if view not in ARTICLE_VIEWS:
+        return json_response(400, {'error': 'Invalid query parameters'})
+    if_none_match = get_header(request_headers, 'If-None-Match')
+    cache_key = (f'{kind}{view_suffix(view)}', lookup)
+    article_statement = f'{article_statement}{view_suffix(view)}'
     
-    cur.close()
-    conn.close()
+    async with read_router.async_database(read_primary.get()) as db:
+        if if_none_match or response_cache.contains(cache_key):
+            stamp = await async_fetchrow(db, statements.sql(stamp_statement), lookup)
+            early = cached_article_response(cache_key, stamp, if_none_match, view)
+            if early:
+                return early
+        
+        article = await async_fetchrow(db, statements.sql(article_statement), lookup)
     
-    return {
-        'statusCode': 200,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({
-            'stats': {
-                'total_articles': articles_count,
-                'total_users': users_count,
-                'subscribers': subscribers_count
-            }
-        })
-    }
+    return article_response(cache_key, article, view)
 
 
-def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    method: str = event.get('httpMethod', 'GET')
+@traced_async
+async def async_handle_get_article(article_id: int, request_headers: Dict[str, Any], view: str = 'read') -> Dict[str, Any]:
+    return await async_serve_article(request_headers, 'article', 'article_stamp', 'article_by_id', article_id, view)
+
+
+@traced_async
+async def async_handle_get_article_by_slug(slug: str, request_headers: Dict[str, Any], view: str = 'read') -> Dict[str, Any]:
+    if len(slug) > 500:
+        return json_response(404, {'error': 'Article not found'})
+    return await async_serve_article(request_headers, 'slug', 'article_stamp_by_slug', 'article_by_slug', slug, view)
+
+
+@traced_async
+async def async_handle_get_user_progress(query_params: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        req = request_models().ProgressQuery(**query_params)
+        after = decode_cursor(req.cursor) if req.cursor else None
+    except ValueError:
+        return json_response(400, {'error': 'Invalid query parameters'})
     
-    if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, X-Auth-Token',
-                'Access-Control-Max-Age': '86400'
-            },
-            'body': ''
-        }
+    user_id = user_data['user_id']
+    async with read_router.async_database(read_primary.get()) as db:
+        if req.view == 'list':
+            name, params = progress_list_statement(req, user_id, after)
+            progress_list = await async_fetch(db, statements.sql(name), *params)
+            return progress_list_response(req, progress_list)
+        
+        async with db.acquire() as conn, conn.transaction(isolation='repeatable_read', readonly=True):
+            stamp = await async_fetchrow(conn, CATALOGUE_STAMP_SQL)
+            rows = await async_fetch(conn, statements.sql('progress_summary'), user_id)
+            resume = await async_fetchrow(conn, statements.sql('progress_resume'), user_id)
+            totals = cached_category_totals(stamp['version'])
+            if totals is None:
+                totals = store_category_totals(stamp['version'], await async_fetch(conn, CATEGORY_TOTALS_SQL))
+    
+    return progress_summary_response(rows, totals, resume)
+
+
+@traced_async
+async def async_handle_get_stats(user_data: Dict[str, Any]) -> Dict[str, Any]:
+    if user_data['role'] not in ['admin', 'editor']:
+        return json_response(403, {'error': 'Insufficient permissions'})
+    
+    async with read_router.async_database(read_primary.get()) as db:
+        counters = await async_fetch(db, statements.sql('stats_counters'), STATS_TOP_COMPLETIONS)
+    
+    return json_response(200, {'stats': stats_payload(counters)})
+
+
+def route_get(query_params: Dict[str, Any], headers: Dict[str, Any],
+              user_data: Optional[Dict[str, Any]]) -> Tuple[Any, Tuple[Any, ...]]:
+    action = query_params.get('action')
+    
+    if action == 'stats':
+        if not user_data:
+            return json_response, (401, {'error': 'Unauthorized'})
+        return handle_get_stats, (user_data,)
+    
+    if action == 'progress':
+        if not user_data:
+            return json_response, (401, {'error': 'Unauthorized'})
+        return handle_get_user_progress, (query_params, user_data)
+    
+    if action == 'search':
+        return handle_search_articles, (query_params,)
+    
+    if action == 'facets':
+        return handle_get_facets, (headers,)
+    
+    if action == 'metrics':
+        if not user_data:
+            return json_response, (401, {'error': 'Unauthorized'})
+        return handle_get_metrics, (user_data,)
+    
+    if action == 'warmup':
+        if not user_data:
+            return json_response, (401, {'error': 'Unauthorized'})
+        return handle_warmup, (user_data,)
+    
+    article_id = query_params.get('id')
+    if article_id:
+        return handle_get_article, (int(article_id), headers, query_params.get('view', 'read'))
     
-    headers = event.get('headers', {})
+    slug = query_params.get('slug')
+    if slug:
+        return handle_get_article_by_slug, (slug, headers, query_params.get('view', 'read'))
+    
+    if 'since' in query_params:
+        return handle_sync_articles, (query_params,)
+    
+    return handle_get_articles, (query_params, headers)
+
+
+def route_request(event: Dict[str, Any]) -> Tuple[Any, Tuple[Any, ...]]:
+    method: str = event.get('httpMethod', 'GET')
+    headers = event.get('headers') or {}
     auth_token = headers.get('X-Auth-Token') or headers.get('x-auth-token')
     
     user_data = None
     if auth_token:
         user_data = verify_token(auth_token)
+    read_primary.set(read_primary_requested(headers))
     
     if method == 'GET':
-        query_params = event.get('queryStringParameters', {}) or {}
-        action = query_params.get('action')
-        
-        if action == 'stats':
-            if not user_data:
-                return {
-                    'statusCode': 401,
-                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                    'body': json.dumps({'error': 'Unauthorized'})
-                }
-            return handle_get_stats(user_data)
-        
-        if action == 'progress':
-            if not user_data:
-                return {
-                    'statusCode': 401,
-                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                    'body': json.dumps({'error': 'Unauthorized'})
-                }
-            return handle_get_user_progress(user_data)
-        
-        article_id = query_params.get('id')
-        if article_id:
-            return handle_get_article(int(article_id))
-        
-        return handle_get_articles(query_params)
+        return route_get(event.get('queryStringParameters', {}) or {}, headers, user_data)
     
     if method == 'POST':
-        if not user_data:
-            return {
-                'statusCode': 401,
-                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps({'error': 'Unauthorized'})
-            }
-        
-        body_data = json.loads(event.get('body', '{}'))
+        body_data = orjson.loads(event.get('body') or '{}')
         action = body_data.get('action')
         
+        if action == 'batch':
+            return handle_batch, (body_data, headers, user_data)
+        
+        if not user_data:
+            return json_response, (401, {'error': 'Unauthorized'})
+        
         if action == 'create':
-            return handle_create_article(body_data, user_data)
+            return handle_create_article, (body_data, user_data)
         elif action == 'update_progress':
-            return handle_update_progress(body_data, user_data)
+            return handle_update_progress, (body_data, user_data)
+        elif action == 'update_progress_batch':
+            return handle_update_progress_batch, (body_data, user_data)
+        elif action == 'reconcile_stats':
+            return handle_reconcile_stats, (user_data,)
+        elif action == 'export':
+            return handle_export, (body_data, user_data)
+        elif action == 'import':
+            return handle_import_articles, (body_data, user_data)
     
     if method == 'PUT':
         if not user_data:
-            return {
-                'statusCode': 401,
-                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps({'error': 'Unauthorized'})
-            }
+            return json_response, (401, {'error': 'Unauthorized'})
         
-        body_data = json.loads(event.get('body', '{}'))
+        body_data = orjson.loads(event.get('body') or '{}')
         article_id = body_data.get('id')
         
         if not article_id:
-            return {
-                'statusCode': 400,
-                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps({'error': 'Article ID required'})
-            }
+            return json_response, (400, {'error': 'Article ID required'})
         
-        return handle_update_article(article_id, body_data, user_data)
+        return handle_update_article, (article_id, body_data, user_data)
     
-    return {
-        'statusCode': 405,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({'error': 'Method not allowed'})
-    }
+    return json_response, (405, {'error': 'Method not allowed'})
+
+
+def dispatch_request(event: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+    func, args = route_request(event)
+    return func, func(*args)
+
+
+ASYNC_HANDLERS = {
+    handle_get_articles: async_handle_get_articles,
+    handle_get_facets: async_handle_get_facets,
+    handle_get_article: async_handle_get_article,
+    handle_get_article_by_slug: async_handle_get_article_by_slug,
+    handle_get_user_progress: async_handle_get_user_progress,
+    handle_get_stats: async_handle_get_stats
+}
+
+
+READ_ONLY_POST_HANDLERS = {handle_batch, handle_export}
+
+
+async def async_dispatch_request(event: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+    func, args = route_request(event)
+    native = ASYNC_HANDLERS.get(func)
+    if native is not None:
+        return func, await native(*args)
+    if func is json_response:
+        return func, func(*args)
+    return func, await asyncio.to_thread(func, *args)
+
+
+def finish_response(event: Dict[str, Any], func: Any, response: Dict[str, Any]) -> Dict[str, Any]:
+    writes = event.get('httpMethod') in ('POST', 'PUT') and func not in READ_ONLY_POST_HANDLERS
+    if writes and response['statusCode'] < 400:
+        response = {**response, 'headers': {**response['headers'], **read_primary_headers()}}
+    with span('compress'):
+        return compress_response(response, event.get('headers'))
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    if event.get('httpMethod') == 'OPTIONS':
+        return {'statusCode': 200, 'headers': OPTIONS_HEADERS, 'body': ''}
+    
+    trace = begin_trace(context)
+    try:
+        response = finish_response(event, *dispatch_request(event))
+    except Exception as e:
+        end_trace(trace, event, context, None, e)
+        raise
+    
+    return end_trace(trace, event, context, response)
+
+
+async def async_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    if event.get('httpMethod') == 'OPTIONS':
+        return {'statusCode': 200, 'headers': OPTIONS_HEADERS, 'body': ''}
+    
+    trace = begin_trace(context)
+    try:
+        response = finish_response(event, *await async_dispatch_request(event))
+    except Exception as e:
+        end_trace(trace, event, context, None, e)
+        raise
+    
+    return end_trace(trace, event, context, response)
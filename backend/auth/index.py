@@ -5,151 +5,937 @@ Args: event - dict with httpMethod, body, queryStringParameters
 Returns: HTTP response dict with user data and JWT token
 '''
 
-import json
+import hashlib
+import importlib
+import itertools
+import math
 import os
+import random
 import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
-import psycopg2
-from psycopg2.extras import RealDictCursor
-import bcrypt
-import jwt
-from pydantic import BaseModel, EmailStr, Field, ValidationError
+from functools import lru_cache, wraps
+from types import SimpleNamespace
+from typing import Dict, Any, Optional, List, Tuple
+import orjson
 
 
-class RegisterRequest(BaseModel):
-    email: EmailStr
-    name: str = Field(..., min_length=1, max_length=255)
-    password: str = Field(..., min_length=6)
+class LazyModule:
+    '''
+    Stand-in for a heavy dependency that is imported on first attribute
+    access, so paths that never touch it (e.g. OPTIONS preflights) skip it.
+    '''
 
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
 
-class LoginRequest(BaseModel):
-    email: EmailStr
-    password: str
+    def load(self) -> Any:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
 
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.load(), attr)
 
-class GoogleAuthRequest(BaseModel):
-    google_id: str
-    email: EmailStr
-    name: str
 
+psycopg2 = LazyModule('psycopg2')
+extras = LazyModule('psycopg2.extras')
+asyncio = LazyModule('asyncio')
+asyncpg = LazyModule('asyncpg')
+extensions = LazyModule('psycopg2.extensions')
+bcrypt = LazyModule('bcrypt')
+jwt = LazyModule('jwt')
 
-class ResetPasswordRequest(BaseModel):
-    email: EmailStr
 
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '1'))
+TRACE_SLOW_MS = float(os.environ.get('TRACE_SLOW_MS', '1000'))
+TRACE_SERVER_TIMING = os.environ.get('TRACE_SERVER_TIMING', '0') == '1'
 
-class UpdatePasswordRequest(BaseModel):
-    token: str
-    new_password: str = Field(..., min_length=6)
+
+class RequestTrace:
+    '''
+    Span timings and SQL counters for one invocation. Spans with the same
+    name accumulate, so "db" is the total time spent inside cursor calls.
+    '''
+
+    def __init__(self, request_id: Optional[str]):
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self.queries = 0
+        self.rows = 0
+
+    def add(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def span_ms(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 3) for name, seconds in self.spans.items()}
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar('current_trace', default=None)
+_last_trace: ContextVar[Optional[RequestTrace]] = ContextVar('last_trace', default=None)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+def last_trace() -> Optional[RequestTrace]:
+    return _last_trace.get()
+
+
+@contextmanager
+def span(name: str):
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - started)
+
+
+def traced(func):
+    name = func.__name__
+    
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with span(name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def traced_async(func):
+    name = func.__name__
+    
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        with span(name):
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+@lru_cache(maxsize=None)
+def traced_cursor_class(base: type) -> type:
+    class TracedCursor(base):
+        def execute(self, query, vars=None):
+            trace = current_trace()
+            if trace is None:
+                return super().execute(query, vars)
+            started = time.perf_counter()
+            try:
+                return super().execute(query, vars)
+            finally:
+                trace.queries += 1
+                trace.add('db', time.perf_counter() - started)
+
+        def executemany(self, query, vars_list):
+            trace = current_trace()
+            if trace is None:
+                return super().executemany(query, vars_list)
+            started = time.perf_counter()
+            try:
+                return super().executemany(query, vars_list)
+            finally:
+                trace.queries += 1
+                trace.add('db', time.perf_counter() - started)
+
+        def fetchone(self):
+            row = super().fetchone()
+            trace = current_trace()
+            if trace is not None and row is not None:
+                trace.rows += 1
+            return row
+
+        def fetchmany(self, size=None):
+            rows = super().fetchmany(size) if size is not None else super().fetchmany()
+            trace = current_trace()
+            if trace is not None:
+                trace.rows += len(rows)
+            return rows
+
+        def fetchall(self):
+            rows = super().fetchall()
+            trace = current_trace()
+            if trace is not None:
+                trace.rows += len(rows)
+            return rows
+
+    TracedCursor.__name__ = 'Traced' + base.__name__
+    return TracedCursor
+
+
+@lru_cache(maxsize=None)
+def traced_connection_class() -> type:
+    class TracedConnection(extensions.connection):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.prepared_statements: set = set()
+
+        def cursor(self, *args, **kwargs):
+            base = kwargs.pop('cursor_factory', None) or extensions.cursor
+            return super().cursor(*args, cursor_factory=traced_cursor_class(base), **kwargs)
+
+    return TracedConnection
+
+
+def begin_trace(context: Any) -> RequestTrace:
+    trace = RequestTrace(getattr(context, 'request_id', None))
+    _current_trace.set(trace)
+    return trace
+
+
+def end_trace(trace: RequestTrace, event: Dict[str, Any], context: Any,
+              response: Optional[Dict[str, Any]], error: Optional[BaseException] = None) -> Optional[Dict[str, Any]]:
+    _current_trace.set(None)
+    _last_trace.set(trace)
+    duration_ms = trace.elapsed_ms()
+    
+    if duration_ms >= TRACE_SLOW_MS or random.random() < TRACE_SAMPLE_RATE:
+        record = {
+            'trace': 'request',
+            'request_id': trace.request_id,
+            'function': getattr(context, 'function_name', None),
+            'method': event.get('httpMethod'),
+            'status': response.get('statusCode') if response else 500,
+            'duration_ms': round(duration_ms, 3),
+            'queries': trace.queries,
+            'rows': trace.rows,
+            'spans': trace.span_ms()
+        }
+        if error is not None:
+            record['error'] = type(error).__name__
+        sys.stdout.write(orjson.dumps(record).decode('utf-8') + '\n')
+    
+    if TRACE_SERVER_TIMING and response is not None:
+        timing = ', '.join(f'{name};dur={ms:.1f}' for name, ms in trace.span_ms().items())
+        response = {
+            **response,
+            'headers': {
+                **response['headers'],
+                'Server-Timing': f'{timing}, total;dur={duration_ms:.1f}' if timing else f'total;dur={duration_ms:.1f}',
+                'Timing-Allow-Origin': '*'
+            }
+        }
+    return response
+
+
+@lru_cache(maxsize=None)
+def request_models() -> SimpleNamespace:
+    from pydantic import BaseModel, ConfigDict, EmailStr, Field
+    
+    class RegisterRequest(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        email: EmailStr
+        name: str = Field(..., min_length=1, max_length=255)
+        password: str = Field(..., min_length=6)
+    
+    class LoginRequest(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        email: EmailStr
+        password: str
+    
+    class GoogleAuthRequest(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        google_id: str
+        email: EmailStr
+        name: str
+    
+    class ResetPasswordRequest(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        email: EmailStr
+    
+    class UpdatePasswordRequest(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        token: str
+        new_password: str = Field(..., min_length=6)
+    
+    return SimpleNamespace(
+        RegisterRequest=RegisterRequest,
+        LoginRequest=LoginRequest,
+        GoogleAuthRequest=GoogleAuthRequest,
+        ResetPasswordRequest=ResetPasswordRequest,
+        UpdatePasswordRequest=UpdatePasswordRequest
+    )
+
+
+JSON_HEADERS = {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'}
+OPTIONS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization',
+    'Access-Control-Max-Age': '86400'
+}
+
+
+def dumps(payload: Any) -> str:
+    return orjson.dumps(payload, option=orjson.OPT_NAIVE_UTC).decode('utf-8')
+
+
+def json_response(status_code: int, payload: Any, extra_headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    with span('serialize'):
+        body = dumps(payload)
+    return {
+        'statusCode': status_code,
+        'headers': {**JSON_HEADERS, **extra_headers} if extra_headers else JSON_HEADERS,
+        'body': body
+    }
+
+
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', '4'))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '5'))
+DB_POOL_HEALTHCHECK_AFTER = float(os.environ.get('DB_POOL_HEALTHCHECK_AFTER', '10'))
+DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', '5'))
+
+
+class PoolExhaustedError(Exception):
+    pass
+
+
+class ConnectionPool:
+    '''
+    Bounded pool of psycopg2 connections kept alive across warm invocations.
+    Idle connections are reset (and pinged if idle for a while) before reuse;
+    broken ones are dropped and replaced on demand.
+    '''
+
+    def __init__(self, dsn: str, max_size: int, timeout: float, healthcheck_after: float):
+        self.dsn = dsn
+        self.max_size = max_size
+        self.timeout = timeout
+        self.healthcheck_after = healthcheck_after
+        self._idle: List[Tuple[Any, float]] = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self.counters = {'hits': 0, 'misses': 0, 'discarded': 0, 'timeouts': 0}
+
+    def _count(self, name: str) -> None:
+        with self._cond:
+            self.counters[name] += 1
+
+    def _reset(self, conn: Any, idle_since: float) -> bool:
+        if conn.closed or conn.get_transaction_status() == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        try:
+            if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            conn.set_session(isolation_level='DEFAULT', readonly='DEFAULT', deferrable='DEFAULT', autocommit=False)
+            if time.monotonic() - idle_since >= self.healthcheck_after:
+                with conn.cursor() as cur:
+                    cur.execute('SELECT 1')
+                conn.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _discard(self, conn: Any) -> None:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        with self._cond:
+            self._size -= 1
+            self.counters['discarded'] += 1
+            self._cond.notify()
+
+    def getconn(self) -> Any:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn = None
+            with self._cond:
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.counters['timeouts'] += 1
+                        raise PoolExhaustedError(f'No free database connection within {self.timeout}s')
+                    self._cond.wait(remaining)
+                    continue
+            
+            if conn is None:
+                try:
+                    conn = psycopg2.connect(
+                        self.dsn,
+                        connect_timeout=DB_CONNECT_TIMEOUT,
+                        connection_factory=traced_connection_class()
+                    )
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                self._count('misses')
+                return conn
+            
+            if self._reset(conn, idle_since):
+                self._count('hits')
+                return conn
+            self._discard(conn)
+
+    def putconn(self, conn: Any, discard: bool = False) -> None:
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        if discard or conn.closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        with span('db_connect'):
+            conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, discard=broken)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {**self.counters, 'size': self._size, 'idle': len(self._idle), 'max_size': self.max_size}
+
+
+_db_pool: Optional[ConnectionPool] = None
+_db_pool_lock = threading.Lock()
+
+
+def get_db_pool() -> ConnectionPool:
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = ConnectionPool(
+                    os.environ.get('DATABASE_URL'),
+                    max_size=DB_POOL_MAX_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    healthcheck_after=DB_POOL_HEALTHCHECK_AFTER
+                )
+    return _db_pool
 
 
 def get_db_connection():
-    database_url = os.environ.get('DATABASE_URL')
-    return psycopg2.connect(database_url)
+    return get_db_pool().connection()
+
+
+DB_ASYNC_POOL_MAX_SIZE = int(os.environ.get('DB_ASYNC_POOL_MAX_SIZE', '10'))
+
+
+class AsyncPools:
+    '''
+    asyncpg pools for the async handler, one per DSN. A pool belongs to the
+    event loop that created it, so a different loop gets a fresh pool.
+    '''
+
+    def __init__(self):
+        self._pools: Dict[str, Tuple[Any, Any]] = {}
+
+    async def get(self, dsn: str) -> Any:
+        loop = asyncio.get_running_loop()
+        entry = self._pools.get(dsn)
+        if entry is None or entry[0] is not loop:
+            entry = (loop, asyncio.ensure_future(asyncpg.create_pool(
+                dsn,
+                min_size=0,
+                max_size=DB_ASYNC_POOL_MAX_SIZE,
+                timeout=DB_CONNECT_TIMEOUT,
+                statement_cache_size=100 if DB_PREPARED_STATEMENTS else 0
+            )))
+            self._pools[dsn] = entry
+        try:
+            return await entry[1]
+        except Exception:
+            if self._pools.get(dsn) is entry:
+                del self._pools[dsn]
+            raise
+
+
+async_pools = AsyncPools()
+
+
+async def get_async_db() -> Any:
+    with span('db_connect'):
+        return await async_pools.get(os.environ.get('DATABASE_URL'))
+
+
+async def async_fetch(db: Any, sql: str, *args: Any) -> List[Dict[str, Any]]:
+    trace = current_trace()
+    started = time.perf_counter()
+    try:
+        rows = await db.fetch(sql, *args)
+    finally:
+        if trace is not None:
+            trace.queries += 1
+            trace.add('db', time.perf_counter() - started)
+    if trace is not None:
+        trace.rows += len(rows)
+    return [dict(row) for row in rows]
+
+
+async def async_fetchrow(db: Any, sql: str, *args: Any) -> Optional[Dict[str, Any]]:
+    rows = await async_fetch(db, sql, *args)
+    return rows[0] if rows else None
+
+
+DB_PREPARED_STATEMENTS = os.environ.get('DB_PREPARED_STATEMENTS', '1') == '1'
+STATEMENT_PARAM_PATTERN = re.compile(r'\$(\d+)')
+
+
+class StatementRegistry:
+    '''
+    Hot statements written with $n placeholders, PREPAREd once per pooled
+    connection and then run with EXECUTE. With DB_PREPARED_STATEMENTS=0
+    (e.g. behind a transaction-mode PgBouncer) the same text is sent as a
+    regular parameterised query.
+    '''
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.statements: Dict[str, Tuple[str, str]] = {}
+        self.counters = {'prepared': 0, 'executed': 0}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, sql: str) -> None:
+        fallback = STATEMENT_PARAM_PATTERN.sub(r'%(p\1)s', sql.replace('%', '%%'))
+        self.statements[name] = (sql, fallback)
+
+    def execute(self, cur: Any, name: str, params: Tuple[Any, ...]) -> None:
+        sql, fallback = self.statements[name]
+        if not self.enabled:
+            cur.execute(fallback, {f'p{i}': value for i, value in enumerate(params, 1)})
+            return
+        
+        prepared = cur.connection.prepared_statements
+        if name not in prepared:
+            cur.execute(f'PREPARE {name} AS {sql}')
+            prepared.add(name)
+            with self._lock:
+                self.counters['prepared'] += 1
+        
+        cur.execute(f'EXECUTE {name} ({", ".join(["%s"] * len(params))})', params)
+        with self._lock:
+            self.counters['executed'] += 1
+
+    def sql(self, name: str) -> str:
+        return self.statements[name][0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, 'enabled': self.enabled, 'registered': len(self.statements)}
+
+
+statements = StatementRegistry(DB_PREPARED_STATEMENTS)
+
+
+JWT_SECRET = os.environ.get('JWT_SECRET', 'default-secret-key')
+JWT_ALGORITHMS = ['HS256']
+JWT_DECODE_OPTIONS = {'require': ['exp']}
+JWT_TOKEN_PATTERN = re.compile(r'^[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+$')
+JWT_MAX_LENGTH = 4096
+TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get('TOKEN_CACHE_MAX_ENTRIES', '1024'))
+TOKEN_NEGATIVE_TTL = float(os.environ.get('TOKEN_NEGATIVE_TTL', '60'))
+
+
+class TokenCache:
+    '''
+    Bounded cache of verified JWT claims keyed by token digest.
+    Valid entries live until the token's exp; rejected tokens are kept in a
+    separate LRU for a short while so repeats skip the HMAC check.
+    '''
+
+    def __init__(self, max_entries: int, negative_ttl: float):
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self._valid: 'OrderedDict[bytes, Tuple[Dict[str, Any], float]]' = OrderedDict()
+        self._invalid: 'OrderedDict[bytes, float]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'rejected': 0, 'evictions': 0}
+
+    def lookup(self, digest: bytes) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        now = time.time()
+        with self._lock:
+            entry = self._valid.get(digest)
+            if entry and entry[1] > now:
+                self._valid.move_to_end(digest)
+                self.counters['hits'] += 1
+                return True, entry[0]
+            if entry:
+                del self._valid[digest]
+            
+            rejected_until = self._invalid.get(digest)
+            if rejected_until and rejected_until > now:
+                self.counters['rejected'] += 1
+                return True, None
+            if rejected_until:
+                del self._invalid[digest]
+            
+            self.counters['misses'] += 1
+            return False, None
+
+    def _store(self, entries: 'OrderedDict[bytes, Any]', digest: bytes, value: Any) -> None:
+        with self._lock:
+            entries[digest] = value
+            entries.move_to_end(digest)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def put_valid(self, digest: bytes, claims: Dict[str, Any]) -> None:
+        self._store(self._valid, digest, (claims, float(claims['exp'])))
+
+    def put_invalid(self, digest: bytes) -> None:
+        self._store(self._invalid, digest, time.time() + self.negative_ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, 'valid': len(self._valid), 'invalid': len(self._invalid), 'max_entries': self.max_entries}
+
+
+token_cache = TokenCache(TOKEN_CACHE_MAX_ENTRIES, TOKEN_NEGATIVE_TTL)
+
+
+def verify_token(token: str) -> Optional[Dict[str, Any]]:
+    if not token or len(token) > JWT_MAX_LENGTH or not JWT_TOKEN_PATTERN.match(token):
+        return None
+    
+    digest = hashlib.sha256(token.encode('utf-8')).digest()
+    found, claims = token_cache.lookup(digest)
+    if found:
+        return claims
+    
+    try:
+        with span('jwt'):
+            claims = jwt.decode(token, JWT_SECRET, algorithms=JWT_ALGORITHMS, options=JWT_DECODE_OPTIONS)
+    except jwt.InvalidTokenError:
+        token_cache.put_invalid(digest)
+        return None
+    
+    token_cache.put_valid(digest, claims)
+    return claims
 
 
 def generate_jwt(user_id: int, email: str, role: str) -> str:
-    jwt_secret = os.environ.get('JWT_SECRET', 'default-secret-key')
     payload = {
         'user_id': user_id,
         'email': email,
         'role': role,
         'exp': datetime.utcnow() + timedelta(days=30)
     }
-    return jwt.encode(payload, jwt_secret, algorithm='HS256')
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHMS[0])
+
+
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+BCRYPT_WORKERS = int(os.environ.get('BCRYPT_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+_bcrypt_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix='bcrypt')
+_dummy_hash: Optional[str] = None
+
+
+def _hash_password_sync(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(BCRYPT_ROUNDS)).decode('utf-8')
 
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    with span('bcrypt'):
+        return _bcrypt_executor.submit(_hash_password_sync, password).result()
+
+
+def _verify_password_sync(password: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    except ValueError:
+        return False
 
 
 def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    with span('bcrypt'):
+        return _bcrypt_executor.submit(_verify_password_sync, password, hashed).result()
 
 
+def hash_rounds(hashed: str) -> Optional[int]:
+    parts = hashed.split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def get_dummy_hash() -> str:
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = _hash_password_sync('dummy-password-for-timing')
+    return _dummy_hash
+
+
+RATE_LIMIT_STORE = os.environ.get('RATE_LIMIT_STORE', 'memory')
+RATE_LIMIT_IP_BURST = int(os.environ.get('RATE_LIMIT_IP_BURST', '30'))
+RATE_LIMIT_IP_PER_MINUTE = float(os.environ.get('RATE_LIMIT_IP_PER_MINUTE', '30'))
+RATE_LIMIT_EMAIL_BURST = int(os.environ.get('RATE_LIMIT_EMAIL_BURST', '5'))
+RATE_LIMIT_EMAIL_PER_MINUTE = float(os.environ.get('RATE_LIMIT_EMAIL_PER_MINUTE', '5'))
+RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', '10000'))
+RATE_LIMIT_PRUNE_EVERY = 1000
+
+
+class MemoryBucketStore:
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, 'OrderedDict[str, Tuple[float, float]]'] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, burst: int, rate: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            buckets = self._buckets.setdefault(key.split(':', 1)[0], OrderedDict())
+            tokens, updated_at = buckets.pop(key, (float(burst), now))
+            tokens = min(float(burst), tokens + (now - updated_at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            buckets[key] = (tokens, now)
+            while len(buckets) > self.max_keys:
+                buckets.popitem(last=False)
+        return 0.0 if allowed else (1 - tokens) / rate
+
+
+class PostgresBucketStore:
+    REFILL = "LEAST(%(burst)s, b.tokens + EXTRACT(EPOCH FROM now() - b.updated_at) * %(rate)s)"
+    TAKE_SQL = f"""
+        INSERT INTO rate_limit_buckets AS b (key, tokens, allowed, updated_at)
+        VALUES (%(key)s, %(burst)s - 1, TRUE, now())
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = {REFILL} - CASE WHEN {REFILL} >= 1 THEN 1 ELSE 0 END,
+            allowed = {REFILL} >= 1,
+            updated_at = now()
+        RETURNING tokens, allowed
+    """
+
+    def __init__(self):
+        self._calls = itertools.count(1)
+
+    def take(self, key: str, burst: int, rate: float) -> float:
+        call = next(self._calls)
+        with get_db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(self.TAKE_SQL, {'key': key, 'burst': burst, 'rate': rate})
+            tokens, allowed = cur.fetchone()
+            if call % RATE_LIMIT_PRUNE_EVERY == 0:
+                cur.execute("DELETE FROM rate_limit_buckets WHERE updated_at < now() - interval '1 hour'")
+            conn.commit()
+            cur.close()
+        return 0.0 if allowed else (1 - tokens) / rate
+
+
+class RateLimiter:
+    '''
+    Token-bucket limiter for credential endpoints, keyed per client IP and
+    per email. Checked before any user lookup or password hashing. When the
+    shared store fails, buckets fall back to this instance's memory instead
+    of letting the request through.
+    '''
+
+    def __init__(self, store: Any):
+        self.store = store
+        self.fallback = store if isinstance(store, MemoryBucketStore) else MemoryBucketStore(RATE_LIMIT_MAX_KEYS)
+        self._lock = threading.Lock()
+        self.counters = {'allowed': 0, 'rejected_ip': 0, 'rejected_email': 0, 'store_errors': 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def _take(self, key: str, burst: int, per_minute: float) -> float:
+        try:
+            return self.store.take(key, burst, per_minute / 60.0)
+        except Exception as e:
+            self._count('store_errors')
+            sys.stdout.write(orjson.dumps({
+                'trace': 'rate_limit',
+                'error': type(e).__name__,
+                'store': RATE_LIMIT_STORE,
+                'fallback': 'memory'
+            }).decode('utf-8') + '\n')
+            return self.fallback.take(key, burst, per_minute / 60.0)
+
+    def check(self, ip: str, email: Optional[str] = None) -> float:
+        retry_after = self._take(f'ip:{ip}', RATE_LIMIT_IP_BURST, RATE_LIMIT_IP_PER_MINUTE)
+        if retry_after:
+            self._count('rejected_ip')
+            return retry_after
+        if email:
+            retry_after = self._take(f'email:{email.strip().lower()}', RATE_LIMIT_EMAIL_BURST, RATE_LIMIT_EMAIL_PER_MINUTE)
+            if retry_after:
+                self._count('rejected_email')
+                return retry_after
+        self._count('allowed')
+        return 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, 'store': RATE_LIMIT_STORE}
+
+
+rate_limiter = RateLimiter(PostgresBucketStore() if RATE_LIMIT_STORE == 'postgres' else MemoryBucketStore(RATE_LIMIT_MAX_KEYS))
+
+
+def get_client_ip(event: Dict[str, Any]) -> str:
+    identity = (event.get('requestContext') or {}).get('identity') or {}
+    if identity.get('sourceIp'):
+        return identity['sourceIp']
+    for key, value in (event.get('headers') or {}).items():
+        if key.lower() == 'x-forwarded-for' and value:
+            return value.split(',')[-1].strip() or 'unknown'
+    return 'unknown'
+
+
+def too_many_requests_response(retry_after: float) -> Dict[str, Any]:
+    return json_response(429, {'error': 'Too many requests'}, {'Retry-After': str(max(1, math.ceil(retry_after)))})
+
+
+statements.register(
+    'user_by_email',
+    "SELECT id, email, name, password_hash, role, subscription_date FROM users WHERE email = $1"
+)
+statements.register('user_by_id', "SELECT id, email, name, role, subscription_date FROM users WHERE id = $1")
+
+
+@traced
 def handle_register(body_data: Dict[str, Any]) -> Dict[str, Any]:
-    req = RegisterRequest(**body_data)
-    
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    req = request_models().RegisterRequest(**body_data)
     
-    cur.execute("SELECT id FROM users WHERE email = %s", (req.email,))
-    if cur.fetchone():
+    with get_db_connection() as conn:
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        statements.execute(cur, 'user_by_email', (req.email,))
+        existing = cur.fetchone()
+        conn.rollback()
+        if existing:
+            cur.close()
+            return json_response(400, {'error': 'Email already registered'})
+        
+        password_hash = hash_password(req.password)
+        cur.execute(
+            """
+            INSERT INTO users (email, name, password_hash, role, created_at)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (email) DO NOTHING
+            RETURNING id, email, name, role, created_at
+            """,
+            (req.email, req.name, password_hash, 'user', datetime.utcnow())
+        )
+        user = cur.fetchone()
+        conn.commit()
         cur.close()
-        conn.close()
-        return {
-            'statusCode': 400,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Email already registered'})
-        }
-    
-    password_hash = hash_password(req.password)
-    
-    cur.execute(
-        """
-        INSERT INTO users (email, name, password_hash, role, created_at)
-        VALUES (%s, %s, %s, %s, %s)
-        RETURNING id, email, name, role, created_at
-        """,
-        (req.email, req.name, password_hash, 'user', datetime.utcnow())
-    )
     
-    user = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
+    if not user:
+        return json_response(400, {'error': 'Email already registered'})
     
     token = generate_jwt(user['id'], user['email'], user['role'])
     
-    return {
-        'statusCode': 201,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({
-            'user': {
-                'id': user['id'],
-                'email': user['email'],
-                'name': user['name'],
-                'role': user['role']
-            },
-            'token': token
-        }, default=str)
-    }
+    return json_response(201, {
+        'user': {
+            'id': user['id'],
+            'email': user['email'],
+            'name': user['name'],
+            'role': user['role']
+        },
+        'token': token
+    })
 
 
+@traced
 def handle_login(body_data: Dict[str, Any]) -> Dict[str, Any]:
-    req = LoginRequest(**body_data)
+    req = request_models().LoginRequest(**body_data)
     
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    with get_db_connection() as conn:
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        statements.execute(cur, 'user_by_email', (req.email,))
+        user = cur.fetchone()
+        cur.close()
     
-    cur.execute(
-        "SELECT id, email, name, password_hash, role, subscription_date FROM users WHERE email = %s",
-        (req.email,)
-    )
-    user = cur.fetchone()
-    cur.close()
-    conn.close()
-    
-    if not user or not user['password_hash']:
-        return {
-            'statusCode': 401,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Invalid credentials'})
-        }
+    stored_hash = user['password_hash'] if user else None
+    password_ok = verify_password(req.password, stored_hash or get_dummy_hash())
     
-    if not verify_password(req.password, user['password_hash']):
-        return {
-            'statusCode': 401,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Invalid credentials'})
-        }
+    if not stored_hash or not password_ok:
+        return json_response(401, {'error': 'Invalid credentials'})
+    
+    if hash_rounds(stored_hash) != BCRYPT_ROUNDS:
+        new_hash = hash_password(req.password)
+        with get_db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "UPDATE users SET password_hash = %s, updated_at = %s WHERE id = %s AND password_hash = %s",
+                (new_hash, datetime.utcnow(), user['id'], stored_hash)
+            )
+            conn.commit()
+            cur.close()
     
     token = generate_jwt(user['id'], user['email'], user['role'])
     
-    return {
-        'statusCode': 200,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({
+    return json_response(200, {
+        'user': {
+            'id': user['id'],
+            'email': user['email'],
+            'name': user['name'],
+            'role': user['role'],
+            'subscription_date': user['subscription_date']
+        },
+        'token': token
+    })
+
+
+@traced
+def handle_google_auth(body_data: Dict[str, Any]) -> Dict[str, Any]:
+    req = request_models().GoogleAuthRequest(**body_data)
+    
+    with get_db_connection() as conn:
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        
+        cur.execute("SELECT id, email, name, role, subscription_date FROM users WHERE google_id = %s", (req.google_id,))
+        user = cur.fetchone()
+        
+        if not user:
+            cur.execute(
+                """
+                INSERT INTO users (email, name, google_id, role, created_at)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING id, email, name, role
+                """,
+                (req.email, req.name, req.google_id, 'user', datetime.utcnow())
+            )
+            new_user = cur.fetchone()
+            conn.commit()
+        
+        cur.close()
+    
+    if user:
+        token = generate_jwt(user['id'], user['email'], user['role'])
+        return json_response(200, {
             'user': {
                 'id': user['id'],
                 'email': user['email'],
@@ -158,143 +944,195 @@ def handle_login(body_data: Dict[str, Any]) -> Dict[str, Any]:
                 'subscription_date': user['subscription_date']
             },
             'token': token
-        }, default=str)
-    }
+        })
+    
+    token = generate_jwt(new_user['id'], new_user['email'], new_user['role'])
+    
+    return json_response(201, {
+        'user': {
+            'id': new_user['id'],
+            'email': new_user['email'],
+            'name': new_user['name'],
+            'role': new_user['role']
+        },
+        'token': token
+    })
 
 
-def handle_google_auth(body_data: Dict[str, Any]) -> Dict[str, Any]:
-    req = GoogleAuthRequest(**body_data)
-    
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+@traced
+def handle_verify_token(token: str) -> Dict[str, Any]:
+    decoded = verify_token(token)
     
-    cur.execute("SELECT id, email, name, role, subscription_date FROM users WHERE google_id = %s", (req.google_id,))
-    user = cur.fetchone()
+    if not decoded:
+        return json_response(401, {'error': 'Invalid token'})
     
-    if user:
+    with get_db_connection() as conn:
+        cur = conn.cursor(cursor_factory=extras.RealDictCursor)
+        statements.execute(cur, 'user_by_id', (decoded['user_id'],))
+        user = cur.fetchone()
         cur.close()
-        conn.close()
-        token = generate_jwt(user['id'], user['email'], user['role'])
-        return {
-            'statusCode': 200,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({
-                'user': {
-                    'id': user['id'],
-                    'email': user['email'],
-                    'name': user['name'],
-                    'role': user['role'],
-                    'subscription_date': user['subscription_date']
-                },
-                'token': token
-            }, default=str)
-        }
     
-    cur.execute(
-        """
-        INSERT INTO users (email, name, google_id, role, created_at)
-        VALUES (%s, %s, %s, %s, %s)
-        RETURNING id, email, name, role
-        """,
-        (req.email, req.name, req.google_id, 'user', datetime.utcnow())
-    )
+    return verified_user_response(user)
+
+
+@traced_async
+async def async_handle_verify_token(token: str) -> Dict[str, Any]:
+    decoded = verify_token(token)
     
-    new_user = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
+    if not decoded:
+        return json_response(401, {'error': 'Invalid token'})
     
-    token = generate_jwt(new_user['id'], new_user['email'], new_user['role'])
+    db = await get_async_db()
+    user = await async_fetchrow(db, statements.sql('user_by_id'), decoded['user_id'])
     
-    return {
-        'statusCode': 201,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({
-            'user': {
-                'id': new_user['id'],
-                'email': new_user['email'],
-                'name': new_user['name'],
-                'role': new_user['role']
-            },
-            'token': token
-        }, default=str)
-    }
+    return verified_user_response(user)
 
 
-def handle_verify_token(token: str) -> Dict[str, Any]:
-    jwt_secret = os.environ.get('JWT_SECRET', 'default-secret-key')
+def verified_user_response(user: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not user:
+        return json_response(401, {'error': 'User not found'})
     
-    decoded = jwt.decode(token, jwt_secret, algorithms=['HS256'])
+    return json_response(200, {
+        'user': {
+            'id': user['id'],
+            'email': user['email'],
+            'name': user['name'],
+            'role': user['role'],
+            'subscription_date': user['subscription_date']
+        }
+    })
+
+
+@traced
+def handle_get_metrics(token: str) -> Dict[str, Any]:
+    decoded = verify_token(token)
     
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cur.execute(
-        "SELECT id, email, name, role, subscription_date FROM users WHERE id = %s",
-        (decoded['user_id'],)
-    )
-    user = cur.fetchone()
-    cur.close()
-    conn.close()
+    if not decoded or decoded.get('role') != 'admin':
+        return json_response(403, {'error': 'Insufficient permissions'})
     
-    if not user:
-        return {
-            'statusCode': 401,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'User not found'})
+    return json_response(200, {
+        'metrics': {
+            'db_pool': get_db_pool().stats(),
+            'statements': statements.stats(),
+            'token_cache': token_cache.stats(),
+            'rate_limiter': rate_limiter.stats()
         }
+    })
+
+
+def warmup() -> Dict[str, float]:
+    timings: Dict[str, float] = {}
     
-    return {
-        'statusCode': 200,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({
-            'user': {
-                'id': user['id'],
-                'email': user['email'],
-                'name': user['name'],
-                'role': user['role'],
-                'subscription_date': user['subscription_date']
-            }
-        }, default=str)
-    }
+    started = time.perf_counter()
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT 1")
+        cur.close()
+    timings['db_pool'] = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    jwt.load()
+    timings['jwt'] = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    for model in vars(request_models()).values():
+        model.model_rebuild()
+    timings['models'] = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    get_dummy_hash()
+    timings['bcrypt'] = time.perf_counter() - started
+    
+    return {name: round(seconds * 1000, 2) for name, seconds in timings.items()}
 
 
-def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    method: str = event.get('httpMethod', 'GET')
+@traced
+def handle_warmup(token: str) -> Dict[str, Any]:
+    decoded = verify_token(token)
     
-    if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, Authorization',
-                'Access-Control-Max-Age': '86400'
-            },
-            'body': ''
-        }
+    if not decoded or decoded.get('role') != 'admin':
+        return json_response(403, {'error': 'Insufficient permissions'})
+    
+    return json_response(200, {'warmup_ms': warmup()})
+
+
+def handle_rate_limited(event: Dict[str, Any], func: Any, body_data: Dict[str, Any]) -> Dict[str, Any]:
+    email = body_data.get('email') if body_data.get('action') in ('login', 'register') else None
+    with span('rate_limit'):
+        retry_after = rate_limiter.check(get_client_ip(event), email if isinstance(email, str) else None)
+    if retry_after:
+        return too_many_requests_response(retry_after)
+    return func(body_data)
+
+
+def route_request(event: Dict[str, Any]) -> Tuple[Any, Tuple[Any, ...]]:
+    method: str = event.get('httpMethod', 'GET')
     
     if method == 'POST':
-        body_data = json.loads(event.get('body', '{}'))
+        body_data = orjson.loads(event.get('body') or '{}')
         action = body_data.get('action')
         
         if action == 'register':
-            return handle_register(body_data)
+            return handle_rate_limited, (event, handle_register, body_data)
         elif action == 'login':
-            return handle_login(body_data)
+            return handle_rate_limited, (event, handle_login, body_data)
         elif action == 'google_auth':
-            return handle_google_auth(body_data)
+            return handle_google_auth, (body_data,)
         elif action == 'verify_token':
-            token = body_data.get('token', '')
-            return handle_verify_token(token)
+            return handle_verify_token, (body_data.get('token', ''),)
+        elif action == 'metrics':
+            return handle_get_metrics, (body_data.get('token', ''),)
+        elif action == 'warmup':
+            return handle_warmup, (body_data.get('token', ''),)
         else:
-            return {
-                'statusCode': 400,
-                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps({'error': 'Unknown action'})
-            }
+            return json_response, (400, {'error': 'Unknown action'})
     
-    return {
-        'statusCode': 405,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({'error': 'Method not allowed'})
-    }
+    return json_response, (405, {'error': 'Method not allowed'})
+
+
+def dispatch_request(event: Dict[str, Any]) -> Dict[str, Any]:
+    func, args = route_request(event)
+    return func(*args)
+
+
+ASYNC_HANDLERS = {
+    handle_verify_token: async_handle_verify_token
+}
+
+
+async def async_dispatch_request(event: Dict[str, Any]) -> Dict[str, Any]:
+    func, args = route_request(event)
+    native = ASYNC_HANDLERS.get(func)
+    if native is not None:
+        return await native(*args)
+    if func is json_response:
+        return func(*args)
+    return await asyncio.to_thread(func, *args)
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    if event.get('httpMethod') == 'OPTIONS':
+        return {'statusCode': 200, 'headers': OPTIONS_HEADERS, 'body': ''}
+    
+    trace = begin_trace(context)
+    try:
+        response = dispatch_request(event)
+    except Exception as e:
+        end_trace(trace, event, context, None, e)
+        raise
+    
+    return end_trace(trace, event, context, response)
+
+
+async def async_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    if event.get('httpMethod') == 'OPTIONS':
+        return {'statusCode': 200, 'headers': OPTIONS_HEADERS, 'body': ''}
+    
+    trace = begin_trace(context)
+    try:
+        response = await async_dispatch_request(event)
+    except Exception as e:
+        end_trace(trace, event, context, None, e)
+        raise
+    
+    return end_trace(trace, event, context, response)
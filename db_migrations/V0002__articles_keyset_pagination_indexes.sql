@@ -0,0 +1,8 @@
+-- Составные индексы для keyset-пагинации списка статей:
+-- фильтры status/category + сортировка (created_at DESC, id DESC)
+CREATE INDEX IF NOT EXISTS idx_articles_created_id ON articles(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_status_created_id ON articles(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_status_category_created_id ON articles(status, category, created_at DESC, id DESC);
+
+-- Одиночный индекс по status покрывается составными индексами выше
+DROP INDEX IF EXISTS idx_articles_status;
@@ -0,0 +1,51 @@
+-- Версия строки статьи: увеличивается при каждом изменении, используется для ETag
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 1;
+
+-- Глобальные версии наборов данных (для ETag списков без сканирования таблицы)
+CREATE TABLE IF NOT EXISTS content_versions (
+    name VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'UTC')
+);
+
+INSERT INTO content_versions (name) VALUES ('articles') ON CONFLICT (name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION articles_bump_row_version() RETURNS trigger AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_articles_row_version ON articles;
+CREATE TRIGGER trg_articles_row_version
+    BEFORE UPDATE ON articles
+    FOR EACH ROW EXECUTE FUNCTION articles_bump_row_version();
+
+CREATE OR REPLACE FUNCTION articles_bump_catalogue_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE content_versions
+    SET version = version + 1, updated_at = (now() AT TIME ZONE 'UTC')
+    WHERE name = 'articles';
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_articles_catalogue_version ON articles;
+CREATE TRIGGER trg_articles_catalogue_version
+    AFTER INSERT OR UPDATE OR DELETE ON articles
+    FOR EACH STATEMENT EXECUTE FUNCTION articles_bump_catalogue_version();
+
+-- Смена имени автора меняет представление его статей (author_name)
+CREATE OR REPLACE FUNCTION articles_bump_author_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE articles SET version = version + 1 WHERE author_id = NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_users_author_name_version ON users;
+CREATE TRIGGER trg_users_author_name_version
+    AFTER UPDATE OF name ON users
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION articles_bump_author_version();
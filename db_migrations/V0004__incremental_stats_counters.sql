@@ -0,0 +1,156 @@
+-- Предрасчитанные счётчики для админ-статистики, поддерживаются триггерами
+CREATE TABLE IF NOT EXISTS stats_counters (
+    metric VARCHAR(50) NOT NULL,
+    dimension VARCHAR(255) NOT NULL DEFAULT '',
+    value BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, dimension)
+);
+
+CREATE INDEX IF NOT EXISTS idx_stats_counters_metric_value ON stats_counters(metric, value DESC);
+
+CREATE OR REPLACE FUNCTION stats_bump(p_metric TEXT, p_dimension TEXT, p_delta BIGINT) RETURNS void AS $$
+BEGIN
+    INSERT INTO stats_counters (metric, dimension, value)
+    VALUES (p_metric, COALESCE(p_dimension, ''), p_delta)
+    ON CONFLICT (metric, dimension) DO UPDATE SET value = stats_counters.value + EXCLUDED.value;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Статьи: всего, по статусу, по категории
+CREATE OR REPLACE FUNCTION stats_track_articles() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM stats_bump('articles_by_status', OLD.status, -1);
+        PERFORM stats_bump('articles_by_category', OLD.category, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM stats_bump('articles_by_status', NEW.status, 1);
+        PERFORM stats_bump('articles_by_category', NEW.category, 1);
+    END IF;
+    IF TG_OP = 'INSERT' THEN
+        PERFORM stats_bump('total_articles', '', 1);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM stats_bump('total_articles', '', -1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_stats_articles ON articles;
+CREATE TRIGGER trg_stats_articles
+    AFTER INSERT OR DELETE ON articles
+    FOR EACH ROW EXECUTE FUNCTION stats_track_articles();
+
+DROP TRIGGER IF EXISTS trg_stats_articles_update ON articles;
+CREATE TRIGGER trg_stats_articles_update
+    AFTER UPDATE OF status, category ON articles
+    FOR EACH ROW WHEN (OLD.status IS DISTINCT FROM NEW.status OR OLD.category IS DISTINCT FROM NEW.category)
+    EXECUTE FUNCTION stats_track_articles();
+
+-- Пользователи: всего и подписчики
+CREATE OR REPLACE FUNCTION stats_track_users() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM stats_bump('total_users', '', -1);
+        END IF;
+        IF OLD.subscription_date IS NOT NULL THEN
+            PERFORM stats_bump('subscribers', '', -1);
+        END IF;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM stats_bump('total_users', '', 1);
+        END IF;
+        IF NEW.subscription_date IS NOT NULL THEN
+            PERFORM stats_bump('subscribers', '', 1);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_stats_users ON users;
+CREATE TRIGGER trg_stats_users
+    AFTER INSERT OR DELETE ON users
+    FOR EACH ROW EXECUTE FUNCTION stats_track_users();
+
+DROP TRIGGER IF EXISTS trg_stats_users_update ON users;
+CREATE TRIGGER trg_stats_users_update
+    AFTER UPDATE OF subscription_date ON users
+    FOR EACH ROW WHEN ((OLD.subscription_date IS NULL) <> (NEW.subscription_date IS NULL))
+    EXECUTE FUNCTION stats_track_users();
+
+-- Прохождения: число завершивших по каждой статье
+CREATE OR REPLACE FUNCTION stats_track_completions() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        IF OLD.completed THEN
+            PERFORM stats_bump('completions_by_article', OLD.article_id::TEXT, -1);
+        END IF;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        IF NEW.completed THEN
+            PERFORM stats_bump('completions_by_article', NEW.article_id::TEXT, 1);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_stats_completions ON user_progress;
+CREATE TRIGGER trg_stats_completions
+    AFTER INSERT OR DELETE ON user_progress
+    FOR EACH ROW EXECUTE FUNCTION stats_track_completions();
+
+DROP TRIGGER IF EXISTS trg_stats_completions_update ON user_progress;
+CREATE TRIGGER trg_stats_completions_update
+    AFTER UPDATE OF completed, article_id ON user_progress
+    FOR EACH ROW WHEN (OLD.completed IS DISTINCT FROM NEW.completed OR OLD.article_id <> NEW.article_id)
+    EXECUTE FUNCTION stats_track_completions();
+
+-- Сверка: пересчитывает счётчики с нуля и исправляет расхождения.
+-- Возвращает число исправленных строк. Блокирует stats_counters, поэтому
+-- параллельные изменения дождутся окончания сверки и не потеряются.
+CREATE OR REPLACE FUNCTION stats_reconcile() RETURNS INTEGER AS $$
+DECLARE
+    corrected INTEGER;
+    removed INTEGER;
+BEGIN
+    LOCK TABLE stats_counters IN EXCLUSIVE MODE;
+
+    WITH expected AS (
+        SELECT 'total_articles' AS metric, '' AS dimension, COUNT(*) AS value FROM articles
+        UNION ALL SELECT 'total_users', '', COUNT(*) FROM users
+        UNION ALL SELECT 'subscribers', '', COUNT(*) FROM users WHERE subscription_date IS NOT NULL
+        UNION ALL SELECT 'articles_by_status', status, COUNT(*) FROM articles GROUP BY status
+        UNION ALL SELECT 'articles_by_category', COALESCE(category, ''), COUNT(*) FROM articles GROUP BY COALESCE(category, '')
+        UNION ALL SELECT 'completions_by_article', article_id::TEXT, COUNT(*) FROM user_progress WHERE completed GROUP BY article_id
+    )
+    INSERT INTO stats_counters (metric, dimension, value)
+    SELECT e.metric, e.dimension, e.value
+    FROM expected e
+    LEFT JOIN stats_counters c ON c.metric = e.metric AND c.dimension = e.dimension
+    WHERE c.value IS DISTINCT FROM e.value
+    ON CONFLICT (metric, dimension) DO UPDATE SET value = EXCLUDED.value;
+    GET DIAGNOSTICS corrected = ROW_COUNT;
+
+    DELETE FROM stats_counters c
+    WHERE c.metric IN ('articles_by_status', 'articles_by_category', 'completions_by_article')
+      AND c.value <> 0
+      AND NOT EXISTS (
+          SELECT 1 FROM articles a WHERE c.metric = 'articles_by_status' AND a.status = c.dimension
+          UNION ALL
+          SELECT 1 FROM articles a WHERE c.metric = 'articles_by_category' AND COALESCE(a.category, '') = c.dimension
+          UNION ALL
+          SELECT 1 FROM user_progress up WHERE c.metric = 'completions_by_article' AND up.completed AND up.article_id::TEXT = c.dimension
+      );
+    GET DIAGNOSTICS removed = ROW_COUNT;
+
+    DELETE FROM stats_counters WHERE value = 0 AND dimension <> '';
+
+    RETURN corrected + removed;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT stats_reconcile();
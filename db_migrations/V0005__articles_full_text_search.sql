@@ -0,0 +1,12 @@
+-- Полнотекстовый поиск по статьям.
+-- Конфигурация russian стеммит кириллицу (russian_stem), а латиницу —
+-- английским стеммером (english_stem), поэтому покрывает смешанный контент.
+-- HTML-теги парсер распознаёт как отдельные токены и не индексирует.
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', COALESCE(title, '')), 'A') ||
+        setweight(to_tsvector('russian', COALESCE(preview_text, '')), 'B') ||
+        setweight(to_tsvector('russian', COALESCE(content, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_articles_search_vector ON articles USING GIN (search_vector);
@@ -0,0 +1,10 @@
+-- Общее для всех инстансов хранилище token bucket для лимитов входа/регистрации.
+-- UNLOGGED: данные не пишутся в WAL и теряются при сбое — для лимитов это допустимо.
+CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_buckets (
+    key VARCHAR(320) PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    allowed BOOLEAN NOT NULL DEFAULT TRUE,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_rate_limit_buckets_updated_at ON rate_limit_buckets(updated_at);
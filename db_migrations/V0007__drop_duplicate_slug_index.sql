@@ -0,0 +1,3 @@
+-- Поиск статьи по slug обслуживает уникальный индекс articles_slug_key,
+-- отдельный idx_articles_slug его дублирует и только замедляет запись.
+DROP INDEX IF EXISTS idx_articles_slug;
@@ -0,0 +1,42 @@
+-- Лента изменений статей для инкрементальной синхронизации (?since=).
+-- В строке хранится id транзакции, последней изменившей статью (xid8 монотонен).
+-- Клиенту отдаются только изменения с xid ниже xmin текущего снимка: все такие
+-- транзакции уже завершены, поэтому долгая транзакция не «перепрыгнет» курсор.
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS change_xid XID8 NOT NULL DEFAULT pg_current_xact_id();
+
+CREATE INDEX IF NOT EXISTS idx_articles_change_xid ON articles(change_xid, id);
+
+CREATE OR REPLACE FUNCTION articles_stamp_change_xid() RETURNS trigger AS $$
+BEGIN
+    NEW.change_xid := pg_current_xact_id();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_articles_change_xid ON articles;
+CREATE TRIGGER trg_articles_change_xid
+    BEFORE INSERT OR UPDATE ON articles
+    FOR EACH ROW EXECUTE FUNCTION articles_stamp_change_xid();
+
+-- Надгробия удалённых статей: клиенты узнают об удалении из той же ленты
+CREATE TABLE IF NOT EXISTS article_tombstones (
+    article_id INTEGER PRIMARY KEY,
+    change_xid XID8 NOT NULL DEFAULT pg_current_xact_id(),
+    deleted_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'UTC')
+);
+
+CREATE INDEX IF NOT EXISTS idx_article_tombstones_change_xid ON article_tombstones(change_xid, article_id);
+
+CREATE OR REPLACE FUNCTION articles_record_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO article_tombstones (article_id) VALUES (OLD.id)
+    ON CONFLICT (article_id) DO UPDATE
+    SET change_xid = pg_current_xact_id(), deleted_at = (now() AT TIME ZONE 'UTC');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_articles_tombstone ON articles;
+CREATE TRIGGER trg_articles_tombstone
+    AFTER DELETE ON articles
+    FOR EACH ROW EXECUTE FUNCTION articles_record_tombstone();
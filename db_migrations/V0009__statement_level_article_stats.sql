@@ -0,0 +1,35 @@
+-- Счётчики статей при вставке и удалении пересчитываются один раз на оператор.
+-- Построчный триггер делал три upsert в одни и те же строки stats_counters на
+-- каждую статью, и массовый импорт упирался в них. Переходная таблица
+-- позволяет сгруппировать изменения и обновить каждый счётчик одной строкой.
+CREATE OR REPLACE FUNCTION stats_track_articles_batch() RETURNS trigger AS $$
+DECLARE
+    delta BIGINT := CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END;
+BEGIN
+    INSERT INTO stats_counters (metric, dimension, value)
+    SELECT d.metric, d.dimension, SUM(d.value) * delta
+    FROM (
+        SELECT 'total_articles' AS metric, '' AS dimension, 1 AS value FROM changed_articles
+        UNION ALL SELECT 'articles_by_status', COALESCE(status, ''), 1 FROM changed_articles
+        UNION ALL SELECT 'articles_by_category', COALESCE(category, ''), 1 FROM changed_articles
+    ) d
+    GROUP BY d.metric, d.dimension
+    ORDER BY d.metric, d.dimension
+    ON CONFLICT (metric, dimension) DO UPDATE SET value = stats_counters.value + EXCLUDED.value;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_stats_articles ON articles;
+
+DROP TRIGGER IF EXISTS trg_stats_articles_insert ON articles;
+CREATE TRIGGER trg_stats_articles_insert
+    AFTER INSERT ON articles
+    REFERENCING NEW TABLE AS changed_articles
+    FOR EACH STATEMENT EXECUTE FUNCTION stats_track_articles_batch();
+
+DROP TRIGGER IF EXISTS trg_stats_articles_delete ON articles;
+CREATE TRIGGER trg_stats_articles_delete
+    AFTER DELETE ON articles
+    REFERENCING OLD TABLE AS changed_articles
+    FOR EACH STATEMENT EXECUTE FUNCTION stats_track_articles_batch();
@@ -0,0 +1,160 @@
+-- Сводка прогресса пользователя по категориям, поддерживается триггерами.
+-- Итоги по категориям читаются одной строкой на категорию, а не
+-- пересчитываются по всем записям user_progress пользователя.
+CREATE TABLE IF NOT EXISTS user_progress_summary (
+    user_id INTEGER NOT NULL,
+    category VARCHAR(100) NOT NULL DEFAULT '',
+    started INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    progress_sum BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, category)
+);
+
+-- Keyset-пагинация подробного списка идёт по (last_visited_at DESC, article_id DESC),
+-- поэтому пустые даты заполняются и запрещаются
+UPDATE user_progress SET last_visited_at = 'epoch'::timestamp WHERE last_visited_at IS NULL;
+ALTER TABLE user_progress ALTER COLUMN last_visited_at SET NOT NULL;
+
+-- Покрывающий индекс для подробного списка и поиска статьи для продолжения
+CREATE INDEX IF NOT EXISTS idx_user_progress_user_visited
+    ON user_progress(user_id, last_visited_at DESC, article_id DESC)
+    INCLUDE (id, progress_percent, completed);
+
+-- Одиночный индекс по user_id покрывается индексом выше и UNIQUE(user_id, article_id)
+DROP INDEX IF EXISTS idx_user_progress_user_id;
+
+-- Применяет изменения одного оператора к сводке: строки old_progress вычитаются,
+-- new_progress прибавляются. Категории без изменений не трогаются, поэтому
+-- повторный визит без нового прогресса не пишет в сводку.
+CREATE OR REPLACE FUNCTION user_progress_summary_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO user_progress_summary (user_id, category, started, completed, progress_sum)
+        SELECT n.user_id, COALESCE(a.category, ''), COUNT(*),
+               COUNT(*) FILTER (WHERE n.completed), SUM(COALESCE(n.progress_percent, 0))
+        FROM new_progress n JOIN articles a ON a.id = n.article_id
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        ON CONFLICT (user_id, category) DO UPDATE SET
+            started = user_progress_summary.started + EXCLUDED.started,
+            completed = user_progress_summary.completed + EXCLUDED.completed,
+            progress_sum = user_progress_summary.progress_sum + EXCLUDED.progress_sum;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO user_progress_summary (user_id, category, started, completed, progress_sum)
+        SELECT d.user_id, d.category, SUM(d.started), SUM(d.completed), SUM(d.progress_sum)
+        FROM (
+            SELECT n.user_id, COALESCE(a.category, '') AS category, 1 AS started,
+                   CASE WHEN n.completed THEN 1 ELSE 0 END AS completed, COALESCE(n.progress_percent, 0) AS progress_sum
+            FROM new_progress n JOIN articles a ON a.id = n.article_id
+            UNION ALL
+            SELECT o.user_id, COALESCE(a.category, ''), -1,
+                   CASE WHEN o.completed THEN -1 ELSE 0 END, -COALESCE(o.progress_percent, 0)
+            FROM old_progress o JOIN articles a ON a.id = o.article_id
+        ) d
+        GROUP BY d.user_id, d.category
+        HAVING SUM(d.started) <> 0 OR SUM(d.completed) <> 0 OR SUM(d.progress_sum) <> 0
+        ORDER BY d.user_id, d.category
+        ON CONFLICT (user_id, category) DO UPDATE SET
+            started = user_progress_summary.started + EXCLUDED.started,
+            completed = user_progress_summary.completed + EXCLUDED.completed,
+            progress_sum = user_progress_summary.progress_sum + EXCLUDED.progress_sum;
+    ELSE
+        INSERT INTO user_progress_summary (user_id, category, started, completed, progress_sum)
+        SELECT o.user_id, COALESCE(a.category, ''), -COUNT(*),
+               -COUNT(*) FILTER (WHERE o.completed), -SUM(COALESCE(o.progress_percent, 0))
+        FROM old_progress o JOIN articles a ON a.id = o.article_id
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        ON CONFLICT (user_id, category) DO UPDATE SET
+            started = user_progress_summary.started + EXCLUDED.started,
+            completed = user_progress_summary.completed + EXCLUDED.completed,
+            progress_sum = user_progress_summary.progress_sum + EXCLUDED.progress_sum;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_user_progress_summary_insert ON user_progress;
+CREATE TRIGGER trg_user_progress_summary_insert
+    AFTER INSERT ON user_progress
+    REFERENCING NEW TABLE AS new_progress
+    FOR EACH STATEMENT EXECUTE FUNCTION user_progress_summary_apply();
+
+DROP TRIGGER IF EXISTS trg_user_progress_summary_update ON user_progress;
+CREATE TRIGGER trg_user_progress_summary_update
+    AFTER UPDATE ON user_progress
+    REFERENCING OLD TABLE AS old_progress NEW TABLE AS new_progress
+    FOR EACH STATEMENT EXECUTE FUNCTION user_progress_summary_apply();
+
+DROP TRIGGER IF EXISTS trg_user_progress_summary_delete ON user_progress;
+CREATE TRIGGER trg_user_progress_summary_delete
+    AFTER DELETE ON user_progress
+    REFERENCING OLD TABLE AS old_progress
+    FOR EACH STATEMENT EXECUTE FUNCTION user_progress_summary_apply();
+
+-- Смена категории статьи переносит прогресс всех её читателей в новую категорию
+CREATE OR REPLACE FUNCTION user_progress_summary_recategorize() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO user_progress_summary (user_id, category, started, completed, progress_sum)
+    SELECT up.user_id, c.category, c.sign,
+           CASE WHEN up.completed THEN c.sign ELSE 0 END, c.sign * COALESCE(up.progress_percent, 0)
+    FROM user_progress up
+    CROSS JOIN (VALUES (COALESCE(OLD.category, ''), -1), (COALESCE(NEW.category, ''), 1)) AS c(category, sign)
+    WHERE up.article_id = NEW.id
+    ORDER BY up.user_id, c.category
+    ON CONFLICT (user_id, category) DO UPDATE SET
+        started = user_progress_summary.started + EXCLUDED.started,
+        completed = user_progress_summary.completed + EXCLUDED.completed,
+        progress_sum = user_progress_summary.progress_sum + EXCLUDED.progress_sum;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_user_progress_summary_category ON articles;
+CREATE TRIGGER trg_user_progress_summary_category
+    AFTER UPDATE OF category ON articles
+    FOR EACH ROW WHEN (COALESCE(OLD.category, '') <> COALESCE(NEW.category, ''))
+    EXECUTE FUNCTION user_progress_summary_recategorize();
+
+-- Сверка: пересчитывает сводку с нуля и исправляет расхождения.
+-- Возвращает число исправленных строк.
+CREATE OR REPLACE FUNCTION user_progress_summary_reconcile() RETURNS INTEGER AS $$
+DECLARE
+    corrected INTEGER;
+    removed INTEGER;
+BEGIN
+    LOCK TABLE user_progress_summary IN EXCLUSIVE MODE;
+
+    WITH expected AS (
+        SELECT up.user_id, COALESCE(a.category, '') AS category, COUNT(*)::INTEGER AS started,
+               (COUNT(*) FILTER (WHERE up.completed))::INTEGER AS completed,
+               SUM(COALESCE(up.progress_percent, 0))::BIGINT AS progress_sum
+        FROM user_progress up JOIN articles a ON a.id = up.article_id
+        GROUP BY 1, 2
+    )
+    INSERT INTO user_progress_summary (user_id, category, started, completed, progress_sum)
+    SELECT e.user_id, e.category, e.started, e.completed, e.progress_sum
+    FROM expected e
+    LEFT JOIN user_progress_summary s ON s.user_id = e.user_id AND s.category = e.category
+    WHERE (s.started, s.completed, s.progress_sum) IS DISTINCT FROM (e.started, e.completed, e.progress_sum)
+    ON CONFLICT (user_id, category) DO UPDATE SET
+        started = EXCLUDED.started,
+        completed = EXCLUDED.completed,
+        progress_sum = EXCLUDED.progress_sum;
+    GET DIAGNOSTICS corrected = ROW_COUNT;
+
+    DELETE FROM user_progress_summary s
+    WHERE s.started <> 0
+      AND NOT EXISTS (
+          SELECT 1 FROM user_progress up JOIN articles a ON a.id = up.article_id
+          WHERE up.user_id = s.user_id AND COALESCE(a.category, '') = s.category
+      );
+    GET DIAGNOSTICS removed = ROW_COUNT;
+
+    DELETE FROM user_progress_summary WHERE started = 0;
+
+    RETURN corrected + removed;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT user_progress_summary_reconcile();
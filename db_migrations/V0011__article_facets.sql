@@ -0,0 +1,92 @@
+-- Число статей в разрезе статус × категория для фасетов каталога.
+-- Поддерживается триггерами на уровне оператора, поэтому боковая панель
+-- читает несколько строк вместо группировки всей таблицы articles.
+CREATE TABLE IF NOT EXISTS article_facets (
+    status VARCHAR(20) NOT NULL,
+    category VARCHAR(100) NOT NULL DEFAULT '',
+    articles BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (status, category)
+);
+
+-- Вставка и удаление прибавляют или вычитают строки changed_articles.
+-- Обновление сравнивает old_articles с new_articles; правки без смены
+-- статуса или категории дают нулевую разницу и в таблицу не пишут.
+CREATE OR REPLACE FUNCTION article_facets_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        INSERT INTO article_facets (status, category, articles)
+        SELECT d.status, d.category, SUM(d.delta)
+        FROM (
+            SELECT status, COALESCE(category, '') AS category, 1 AS delta FROM new_articles
+            UNION ALL SELECT status, COALESCE(category, ''), -1 FROM old_articles
+        ) d
+        GROUP BY d.status, d.category
+        HAVING SUM(d.delta) <> 0
+        ORDER BY d.status, d.category
+        ON CONFLICT (status, category) DO UPDATE SET articles = article_facets.articles + EXCLUDED.articles;
+    ELSE
+        INSERT INTO article_facets (status, category, articles)
+        SELECT status, COALESCE(category, ''), COUNT(*) * CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END
+        FROM changed_articles
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        ON CONFLICT (status, category) DO UPDATE SET articles = article_facets.articles + EXCLUDED.articles;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_article_facets_insert ON articles;
+CREATE TRIGGER trg_article_facets_insert
+    AFTER INSERT ON articles
+    REFERENCING NEW TABLE AS changed_articles
+    FOR EACH STATEMENT EXECUTE FUNCTION article_facets_apply();
+
+DROP TRIGGER IF EXISTS trg_article_facets_update ON articles;
+CREATE TRIGGER trg_article_facets_update
+    AFTER UPDATE ON articles
+    REFERENCING OLD TABLE AS old_articles NEW TABLE AS new_articles
+    FOR EACH STATEMENT EXECUTE FUNCTION article_facets_apply();
+
+DROP TRIGGER IF EXISTS trg_article_facets_delete ON articles;
+CREATE TRIGGER trg_article_facets_delete
+    AFTER DELETE ON articles
+    REFERENCING OLD TABLE AS changed_articles
+    FOR EACH STATEMENT EXECUTE FUNCTION article_facets_apply();
+
+-- Сверка: пересчитывает фасеты с нуля и исправляет расхождения.
+-- Возвращает число исправленных строк.
+CREATE OR REPLACE FUNCTION article_facets_reconcile() RETURNS INTEGER AS $$
+DECLARE
+    corrected INTEGER;
+    removed INTEGER;
+BEGIN
+    LOCK TABLE article_facets IN EXCLUSIVE MODE;
+
+    WITH expected AS (
+        SELECT status, COALESCE(category, '') AS category, COUNT(*) AS articles
+        FROM articles
+        GROUP BY 1, 2
+    )
+    INSERT INTO article_facets (status, category, articles)
+    SELECT e.status, e.category, e.articles
+    FROM expected e
+    LEFT JOIN article_facets f ON f.status = e.status AND f.category = e.category
+    WHERE f.articles IS DISTINCT FROM e.articles
+    ON CONFLICT (status, category) DO UPDATE SET articles = EXCLUDED.articles;
+    GET DIAGNOSTICS corrected = ROW_COUNT;
+
+    DELETE FROM article_facets f
+    WHERE f.articles <> 0
+      AND NOT EXISTS (
+          SELECT 1 FROM articles a WHERE a.status = f.status AND COALESCE(a.category, '') = f.category
+      );
+    GET DIAGNOSTICS removed = ROW_COUNT;
+
+    DELETE FROM article_facets WHERE articles = 0;
+
+    RETURN corrected + removed;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT article_facets_reconcile();
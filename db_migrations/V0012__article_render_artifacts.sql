@@ -0,0 +1,12 @@
+-- Артефакты отрисовки, вычисляемые при записи статьи: очищенный HTML,
+-- текстовая выдержка, число слов, время чтения и оглавление по заголовкам.
+-- Списки отдают выдержку вместо полного content, клиенты больше не
+-- разбирают HTML на каждом чтении.
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS content_html TEXT;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS excerpt TEXT;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS word_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS reading_minutes INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS outline JSONB NOT NULL DEFAULT '[]';
+
+-- Существующие статьи заполняются скриптом scripts/render_articles.py
+-- (строки с content_html IS NULL), так как очистка HTML выполняется в Python
@@ -0,0 +1,22 @@
+'''
+Business: Shared loader that imports a backend function's index.py for the maintenance scripts
+Args: function name under backend/ (load_articles() for the articles function)
+Returns: the executed module
+'''
+
+import importlib.util
+import os
+from typing import Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_function(name: str) -> Any:
+    spec = importlib.util.spec_from_file_location(f'{name}_index', os.path.join(ROOT, 'backend', name, 'index.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_articles() -> Any:
+    return load_function('articles')
@@ -0,0 +1,393 @@
+'''
+Business: Benchmark backend functions by replaying tests.json-style scenarios against a local Postgres
+Args: scenario files (default: scripts/bench/*.json), --seed, --migrate, --requests, --concurrency,
+      --baseline, --save-baseline, --no-baseline, --tolerance; DATABASE_URL must point at a disposable database
+Returns: exit code 0 when every scenario passes its status checks and stays within the baseline, 1 otherwise
+         (including when the baseline file is missing and --no-baseline is not given)
+'''
+
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Dict, Any, List
+
+from _articles import load_function
+from render_articles import render_articles
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(ROOT, 'db_migrations')
+SCENARIO_DIR = os.path.join(ROOT, 'scripts', 'bench')
+DEFAULT_BASELINE = os.path.join(ROOT, 'scripts', 'bench_baseline.json')
+
+BENCH_EMAIL_DOMAIN = 'bench.example.com'
+BENCH_PASSWORD = 'bench-password'
+BENCH_CATEGORIES = ['ui', 'ux', 'typography', 'color', 'layout', 'motion', 'accessibility', 'research']
+BENCH_PARAGRAPH = (
+    'Дизайн-система описывает цвета, типографику и сетку интерфейса. '
+    'A design system documents tokens, components and layout rules so teams ship consistent UI. '
+)
+BENCH_TOKENS = 200
+LATENCY_METRICS = ('p50_ms', 'p95_ms', 'p99_ms')
+
+# Rate limits would otherwise turn a replayed register/login mix into a wall of 429s
+os.environ.setdefault('RATE_LIMIT_IP_BURST', '1000000000')
+os.environ.setdefault('RATE_LIMIT_EMAIL_BURST', '1000000000')
+os.environ.setdefault('JWT_SECRET', 'bench-secret')
+os.environ.setdefault('TRACE_SAMPLE_RATE', '0')
+
+
+def connect() -> Any:
+    import psycopg2
+    return psycopg2.connect(os.environ['DATABASE_URL'])
+
+
+def apply_migrations() -> None:
+    conn = connect()
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute("SELECT to_regclass('public.articles') IS NOT NULL")
+    if cur.fetchone()[0]:
+        conn.close()
+        return
+    for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, 'V*.sql')), key=lambda p: int(os.path.basename(p)[1:].split('__')[0])):
+        with open(path) as f:
+            cur.execute(f.read())
+        print(f'applied {os.path.basename(path)}')
+    conn.close()
+
+
+def seed(articles: int, users: int, progress_per_user: int, password_hash: str) -> None:
+    conn = connect()
+    cur = conn.cursor()
+
+    # Per-row counter and version triggers dominate a million-row load; skip
+    # them when allowed and rebuild the trigger-maintained tables below
+    try:
+        cur.execute("SET session_replication_role = replica")
+    except Exception:
+        conn.rollback()
+
+    cur.execute(
+        """
+        INSERT INTO users (email, name, password_hash, role)
+        SELECT 'bench' || g || '@' || %s, 'Bench User ' || g, %s,
+               CASE WHEN g = 1 THEN 'admin' ELSE 'user' END
+        FROM generate_series(1, %s) g
+        ON CONFLICT (email) DO NOTHING
+        """,
+        (BENCH_EMAIL_DOMAIN, password_hash, users)
+    )
+    cur.execute("SELECT id FROM users WHERE email = %s", (f'bench1@{BENCH_EMAIL_DOMAIN}',))
+    admin_id = cur.fetchone()[0]
+
+    cur.execute(
+        """
+        INSERT INTO articles (title, slug, preview_text, content, category, status, author_id,
+                              created_at, updated_at, published_at)
+        SELECT 'Bench article ' || g, 'bench-article-' || g,
+               'Preview for bench article ' || g,
+               '<h2>Раздел ' || g || '</h2><p>' || repeat(%s, 12) || '</p>',
+               (%s::text[])[1 + g %% %s],
+               CASE WHEN g %% 10 = 0 THEN 'draft' ELSE 'published' END,
+               %s,
+               now() - g * interval '1 minute', now() - g * interval '1 minute',
+               CASE WHEN g %% 10 = 0 THEN NULL ELSE now() - g * interval '1 minute' END
+        FROM generate_series(1, %s) g
+        ON CONFLICT (slug) DO NOTHING
+        """,
+        (BENCH_PARAGRAPH, BENCH_CATEGORIES, len(BENCH_CATEGORIES), admin_id, articles)
+    )
+
+    cur.execute(
+        """
+        WITH a AS (
+            SELECT array_agg(id ORDER BY id) AS ids
+            FROM articles WHERE slug LIKE 'bench-article-%%'
+        ), u AS (
+            SELECT id, row_number() OVER (ORDER BY id) AS n
+            FROM users WHERE email LIKE %s
+        )
+        INSERT INTO user_progress (user_id, article_id, progress_percent, completed, last_visited_at)
+        SELECT u.id, a.ids[1 + (u.n * 37 + k) %% cardinality(a.ids)],
+               (u.n * 7 + k) %% 101, (u.n * 7 + k) %% 101 = 100,
+               now() - ((u.n + k) %% 10000) * interval '1 minute'
+        FROM a, u
+        CROSS JOIN generate_series(0, %s - 1) k
+        ON CONFLICT (user_id, article_id) DO NOTHING
+        """,
+        (f'%@{BENCH_EMAIL_DOMAIN}', min(progress_per_user, articles))
+    )
+    conn.commit()
+
+    conn.autocommit = True
+    cur.execute("SELECT stats_reconcile()")
+    cur.execute("SELECT user_progress_summary_reconcile()")
+    cur.execute("SELECT article_facets_reconcile()")
+    cur.execute("ANALYZE")
+    cur.execute("SELECT (SELECT count(*) FROM articles), (SELECT count(*) FROM users), (SELECT count(*) FROM user_progress)")
+    print('seeded: %d articles, %d users, %d progress rows' % cur.fetchone())
+    conn.close()
+
+
+def bench_fixtures(auth_module: Any) -> Dict[str, Any]:
+    conn = connect()
+    cur = conn.cursor()
+    cur.execute("SELECT id, slug FROM articles WHERE slug LIKE 'bench-article-%' AND status = 'published' LIMIT 1000")
+    articles = cur.fetchall()
+    cur.execute(
+        "SELECT id, email, role FROM users WHERE email LIKE %s ORDER BY id LIMIT %s",
+        (f'%@{BENCH_EMAIL_DOMAIN}', BENCH_TOKENS)
+    )
+    users = cur.fetchall()
+    conn.close()
+    if not articles or not users:
+        raise SystemExit('no bench data found, run with --seed first')
+
+    admin = next(user for user in users if user[2] == 'admin')
+    return {
+        'article_ids': [row[0] for row in articles],
+        'slugs': [row[1] for row in articles],
+        'emails': [user[1] for user in users],
+        'user_tokens': [auth_module.generate_jwt(*user) for user in users if user[2] != 'admin'],
+        'admin_token': auth_module.generate_jwt(*admin)
+    }
+
+
+class Placeholders:
+    '''
+    Resolves {name} markers in scenario events; a string that is exactly one
+    marker is replaced by the raw value so numeric ids stay numeric.
+    '''
+
+    def __init__(self, fixtures: Dict[str, Any], rng: random.Random):
+        self.fixtures = fixtures
+        self.rng = rng
+        self.sequence = 0
+        self.lock = threading.Lock()
+
+    def value(self, name: str) -> Any:
+        if name == 'article_id':
+            return self.rng.choice(self.fixtures['article_ids'])
+        if name == 'slug':
+            return self.rng.choice(self.fixtures['slugs'])
+        if name == 'user_email':
+            return self.rng.choice(self.fixtures['emails'])
+        if name == 'user_token':
+            return self.rng.choice(self.fixtures['user_tokens'])
+        if name == 'admin_token':
+            return self.fixtures['admin_token']
+        if name == 'percent':
+            return self.rng.randint(0, 100)
+        if name == 'password':
+            return BENCH_PASSWORD
+        if name == 'unique':
+            with self.lock:
+                self.sequence += 1
+                return f'{os.getpid()}-{self.sequence}-{uuid.uuid4().hex[:8]}'
+        raise KeyError(f'unknown placeholder {{{name}}}')
+
+    def resolve(self, template: Any) -> Any:
+        if isinstance(template, dict):
+            return {key: self.resolve(value) for key, value in template.items()}
+        if isinstance(template, list):
+            return [self.resolve(value) for value in template]
+        if not isinstance(template, str) or '{' not in template:
+            return template
+        if template.startswith('{') and template.endswith('}') and template.count('{') == 1:
+            return self.value(template[1:-1])
+        result = template
+        while '{' in result:
+            start = result.index('{')
+            end = result.index('}', start)
+            result = result[:start] + str(self.value(result[start + 1:end])) + result[end + 1:]
+        return result
+
+
+def build_event(test: Dict[str, Any], placeholders: Placeholders) -> Dict[str, Any]:
+    test = placeholders.resolve(test)
+    event = {
+        'httpMethod': test.get('method', 'GET'),
+        'headers': test.get('headers') or {},
+        'queryStringParameters': test.get('queryStringParameters'),
+        'requestContext': {'identity': {'sourceIp': '127.0.0.1'}}
+    }
+    if 'body' in test:
+        event['body'] = json.dumps(test['body'])
+    return event
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    latencies = sorted(sample['ms'] for sample in samples)
+    count = len(samples) or 1
+    return {
+        'requests': len(samples),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'queries_per_request': round(sum(sample['queries'] for sample in samples) / count, 3),
+        'bytes_per_response': round(sum(sample['bytes'] for sample in samples) / count, 1),
+        'failures': sum(1 for sample in samples if not sample['ok'])
+    }
+
+
+def run_one(module: Any, function: str, test: Dict[str, Any], placeholders: Placeholders) -> Dict[str, Any]:
+    event = build_event(test, placeholders)
+    context = SimpleNamespace(request_id=uuid.uuid4().hex, function_name=function)
+    started = time.perf_counter()
+    response = module.handler(event, context)
+    elapsed = (time.perf_counter() - started) * 1000
+    body = response.get('body') or ''
+    return {
+        'name': test['name'],
+        'ms': elapsed,
+        'queries': module.last_trace().queries,
+        'bytes': len(body.encode('utf-8')),
+        'ok': response.get('statusCode') == test.get('expectedStatus', response.get('statusCode')),
+        'status': response.get('statusCode')
+    }
+
+
+def load_scenarios(paths: List[str]) -> List[Dict[str, Any]]:
+    scenarios = []
+    for path in paths:
+        with open(path) as f:
+            spec = json.load(f)
+        function = spec.get('function')
+        if not function and os.path.basename(path) == 'tests.json':
+            function = os.path.basename(os.path.dirname(os.path.abspath(path)))
+        function = function or os.path.splitext(os.path.basename(path))[0]
+        for test in spec['tests']:
+            scenarios.append({**test, 'function': function, 'weight': test.get('weight', 1)})
+    return scenarios
+
+
+def run_benchmark(scenarios: List[Dict[str, Any]], modules: Dict[str, Any], placeholders: Placeholders,
+                  requests: int, concurrency: int, rng: random.Random) -> List[Dict[str, Any]]:
+    for scenario in scenarios:
+        run_one(modules[scenario['function']], scenario['function'], scenario, placeholders)
+
+    weights = [scenario['weight'] for scenario in scenarios]
+    plan = rng.choices(scenarios, weights=weights, k=requests)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(
+            lambda scenario: run_one(modules[scenario['function']], scenario['function'], scenario, placeholders),
+            plan
+        ))
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions = []
+    for name, current in report.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in LATENCY_METRICS + ('bytes_per_response',):
+            if metric in previous and current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f'{name}: {metric} {current[metric]} > {previous[metric]} (+{tolerance:.0%})')
+        if current['queries_per_request'] > previous.get('queries_per_request', float('inf')) + 0.01:
+            regressions.append(
+                f'{name}: queries_per_request {current["queries_per_request"]} > {previous["queries_per_request"]}'
+            )
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    header = f'{"scenario":<40} {"n":>6} {"p50":>8} {"p95":>8} {"p99":>8} {"q/req":>6} {"bytes":>8} {"fail":>5}'
+    print(header)
+    print('-' * len(header))
+    for name, row in report.items():
+        print(
+            f'{name[:40]:<40} {row["requests"]:>6} {row["p50_ms"]:>8.2f} {row["p95_ms"]:>8.2f} {row["p99_ms"]:>8.2f} '
+            f'{row["queries_per_request"]:>6.2f} {row["bytes_per_response"]:>8.0f} {row["failures"]:>5}'
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Replay tests.json-style scenarios against local handlers')
+    parser.add_argument('scenarios', nargs='*', help='scenario files (default: scripts/bench/*.json)')
+    parser.add_argument('--migrate', action='store_true', help='apply db_migrations to an empty database')
+    parser.add_argument('--seed', action='store_true', help='insert bench users, articles and progress rows')
+    parser.add_argument('--articles', type=int, default=10000)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--progress-per-user', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=2000, help='measured requests across all scenarios')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--random-seed', type=int, default=2026)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--no-baseline', action='store_true', help='report only, skip the regression gate')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown before failing')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    if 'DATABASE_URL' not in os.environ:
+        raise SystemExit('DATABASE_URL is not set')
+
+    if args.migrate:
+        apply_migrations()
+
+    paths = args.scenarios or sorted(glob.glob(os.path.join(SCENARIO_DIR, '*.json')))
+    scenarios = load_scenarios(paths)
+    modules = {name: load_function(name) for name in {scenario['function'] for scenario in scenarios} | {'auth'}}
+
+    if args.seed:
+        seed(args.articles, args.users, args.progress_per_user, modules['auth'].hash_password(BENCH_PASSWORD))
+        rendered = render_articles(modules.get('articles') or load_function('articles'))
+        print(f'rendered: {rendered} articles')
+
+    rng = random.Random(args.random_seed)
+    placeholders = Placeholders(bench_fixtures(modules['auth']), rng)
+    samples = run_benchmark(scenarios, modules, placeholders, args.requests, args.concurrency, rng)
+
+    report = {}
+    for scenario in scenarios:
+        report[scenario['name']] = summarize([sample for sample in samples if sample['name'] == scenario['name']])
+    report['overall'] = summarize(samples)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    failed = report['overall']['failures'] > 0
+    for sample in samples:
+        if not sample['ok']:
+            print(f'unexpected status {sample["status"]} in "{sample["name"]}"')
+            break
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'baseline saved to {args.baseline}')
+    elif args.no_baseline:
+        print('regression gate skipped')
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        failed = failed or bool(regressions)
+    else:
+        print(f'no baseline at {args.baseline}, run with --save-baseline to create one or --no-baseline to skip the gate')
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
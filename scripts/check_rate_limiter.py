@@ -0,0 +1,81 @@
+'''
+Business: Check the auth token-bucket limiter directly, independent of which instance serves a request
+Args: none; loads backend/auth/index.py with fixed RATE_LIMIT_* settings and never touches the database
+Returns: exit code 0 when every check passes, 1 otherwise
+'''
+
+import contextlib
+import io
+import os
+import sys
+from typing import Any, Callable, List, Tuple
+
+from _articles import load_function
+
+os.environ['RATE_LIMIT_IP_BURST'] = '30'
+os.environ['RATE_LIMIT_IP_PER_MINUTE'] = '30'
+os.environ['RATE_LIMIT_EMAIL_BURST'] = '5'
+os.environ['RATE_LIMIT_EMAIL_PER_MINUTE'] = '5'
+
+
+class FailingStore:
+    def take(self, key: str, burst: int, rate: float) -> float:
+        raise ConnectionError('store unavailable')
+
+
+def email_burst(auth: Any) -> bool:
+    limiter = auth.RateLimiter(auth.MemoryBucketStore(100))
+    results = [limiter.check(f'10.0.0.{n}', 'Victim@Example.com ') for n in range(6)]
+    return all(r == 0 for r in results[:5]) and results[5] > 0 and limiter.check('10.0.1.1', 'victim@example.com') > 0
+
+
+def ip_burst(auth: Any) -> bool:
+    limiter = auth.RateLimiter(auth.MemoryBucketStore(100))
+    results = [limiter.check('10.0.0.1', f'user{n}@example.com') for n in range(31)]
+    return all(r == 0 for r in results[:30]) and results[30] > 0 and limiter.check('10.0.0.2') == 0
+
+
+def eviction_keeps_email_buckets(auth: Any) -> bool:
+    limiter = auth.RateLimiter(auth.MemoryBucketStore(10))
+    for n in range(5):
+        limiter.check(f'10.0.0.{n}', 'victim@example.com')
+    for n in range(100):
+        limiter.check(f'10.1.{n // 250}.{n % 250}')
+    return limiter.check('10.2.0.1', 'victim@example.com') > 0
+
+
+def store_failure_fails_closed(auth: Any) -> bool:
+    limiter = auth.RateLimiter(FailingStore())
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        results = [limiter.check(f'10.0.0.{n}', 'victim@example.com') for n in range(6)]
+    return results[5] > 0 and limiter.stats()['store_errors'] == 12 and '"trace":"rate_limit"' in log.getvalue()
+
+
+def client_ip_uses_proxy_hop(auth: Any) -> bool:
+    forwarded = {'headers': {'X-Forwarded-For': '6.6.6.6, 10.0.0.5'}}
+    return auth.get_client_ip(forwarded) == '10.0.0.5' and auth.get_client_ip({'headers': {}}) == 'unknown'
+
+
+CHECKS: List[Tuple[str, Callable[[Any], bool]]] = [
+    ('email bucket rejects the sixth attempt across IPs', email_burst),
+    ('IP bucket rejects the 31st attempt across emails', ip_burst),
+    ('cycling IPs does not evict email buckets', eviction_keeps_email_buckets),
+    ('store errors fall back to memory buckets', store_failure_fails_closed),
+    ('client IP is the last forwarded hop', client_ip_uses_proxy_hop),
+]
+
+
+def main() -> int:
+    auth = load_function('auth')
+    failures = 0
+    for name, check in CHECKS:
+        if not check(auth):
+            failures += 1
+            print(f'FAIL {name}', file=sys.stderr)
+
+    print(f'{len(CHECKS) - failures}/{len(CHECKS)} rate limiter checks passed', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+'''
+Business: Check that the article renderer strips unsafe markup and keeps the allowed subset
+Args: none; loads backend/articles/index.py without touching the database
+Returns: exit code 0 when every case renders as expected, 1 otherwise
+'''
+
+import sys
+from typing import List, Tuple
+
+from _articles import load_articles
+
+CASES: List[Tuple[str, str, str]] = [
+    ('script tag', '<p>Hi<script>alert(1)</script></p>', '<p>Hi</p>'),
+    ('script inside svg', '<svg><script>alert(1)</script></svg><p>a</p>', '<p>a</p>'),
+    ('style tag', '<style>body{}</style><p>s</p>', '<p>s</p>'),
+    ('javascript: link', '<a href="javascript:alert(1)">x</a>', '<a rel="noopener noreferrer nofollow">x</a>'),
+    ('mixed case javascript: link', '<a href=" JaVaScRiPt:alert(1)">x</a>', '<a rel="noopener noreferrer nofollow">x</a>'),
+    ('entity-encoded javascript: link', '<a href="&#106;avascript:alert(1)">x</a>', '<a rel="noopener noreferrer nofollow">x</a>'),
+    ('entity-encoded tab in scheme', '<a href="jav&#x09;ascript:alert(1)">x</a>', '<a rel="noopener noreferrer nofollow">x</a>'),
+    ('entity-encoded colon', '<a href="javascript&colon;alert(1)">x</a>', '<a rel="noopener noreferrer nofollow">x</a>'),
+    ('data: image', '<img src="data:text/html,x">', ''),
+    ('onerror handler', '<img src=x onerror="alert(1)">', '<img src="x">'),
+    ('onclick handler', '<p onclick="x()">t</p>', '<p>t</p>'),
+    ('style attribute', '<p style="background:url(javascript:x)">s</p>', '<p>s</p>'),
+    ('foreign iframe', '<iframe src="https://evil.example.com/x"></iframe>', ''),
+    ('protocol-relative iframe', '<iframe src="//evil.example/x"></iframe>', ''),
+    ('lookalike YouTube host', '<IFRAME SRC="https://www.youtube.com.evil.example/embed/x"></IFRAME>', ''),
+    ('YouTube iframe', '<iframe src="https://www.youtube.com/embed/abc"></iframe>',
+     '<iframe src="https://www.youtube.com/embed/abc"></iframe>'),
+    ('YouTube iframe handler', '<iframe src="https://www.youtube-nocookie.com/embed/abc" onload="x()"></iframe>',
+     '<iframe src="https://www.youtube-nocookie.com/embed/abc"></iframe>'),
+    ('https link', '<a href="https://example.com">ok</a>',
+     '<a href="https://example.com" rel="noopener noreferrer nofollow">ok</a>'),
+    ('mailto link', '<a href="mailto:a@b.c">m</a>', '<a href="mailto:a@b.c" rel="noopener noreferrer nofollow">m</a>'),
+    ('heading anchor', '<h2>Intro</h2><p>one two</p>', '<h2 id="intro">Intro</h2><p>one two</p>'),
+]
+
+
+def main() -> int:
+    articles = load_articles()
+    failures = 0
+    for name, content, expected in CASES:
+        rendered = articles.render_article(content)['content_html']
+        if rendered != expected:
+            failures += 1
+            print(f'FAIL {name}: {content!r} rendered {rendered!r}, expected {expected!r}', file=sys.stderr)
+
+    outline = articles.render_article('<h2>Intro</h2><p>one two</p>')['outline']
+    if outline != [{'level': 2, 'text': 'Intro', 'id': 'intro'}]:
+        failures += 1
+        print(f'FAIL outline: {outline!r}', file=sys.stderr)
+
+    print(f'{len(CASES) + 1 - failures}/{len(CASES) + 1} renderer checks passed', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
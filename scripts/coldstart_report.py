@@ -0,0 +1,122 @@
+'''
+Business: Report cold-start cost of backend functions and enforce an import-time budget
+Args: function names (default: every backend/<name>/index.py), --budget, --top, --warmup
+Returns: exit code 0 when every function is within budget, 1 otherwise
+'''
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, Any, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+DEFAULT_BUDGET = os.path.join(ROOT, 'scripts', 'coldstart_budget.json')
+
+MARKER = '-- coldstart probe --'
+PROBE = '''
+import importlib.util, json, sys, time
+path, warmup = sys.argv[1], sys.argv[2] == '1'
+result = {}
+print(MARKER, file=sys.stderr, flush=True)
+started = time.perf_counter()
+spec = importlib.util.spec_from_file_location('index', path)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+result['init_ms'] = (time.perf_counter() - started) * 1000
+started = time.perf_counter()
+module.handler({'httpMethod': 'OPTIONS', 'headers': {}}, None)
+result['options_ms'] = (time.perf_counter() - started) * 1000
+if warmup:
+    started = time.perf_counter()
+    result['warmup_steps_ms'] = module.warmup()
+    result['warmup_ms'] = (time.perf_counter() - started) * 1000
+print(json.dumps(result))
+'''.replace('MARKER', repr(MARKER))
+
+
+def discover_functions() -> List[str]:
+    return sorted(
+        name for name in os.listdir(BACKEND_DIR)
+        if os.path.isfile(os.path.join(BACKEND_DIR, name, 'index.py'))
+    )
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    imports = []
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    for line in lines:
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        imports.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def profile_function(name: str, warmup: bool) -> Dict[str, Any]:
+    path = os.path.join(BACKEND_DIR, name, 'index.py')
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE, path, '1' if warmup else '0'],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(path)
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f'{name}: probe failed\n{proc.stderr[-2000:]}')
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    top_level = [entry for entry in parse_importtime(proc.stderr) if not entry[0].startswith(' ')]
+    result['imports'] = sorted(top_level, key=lambda entry: entry[2], reverse=True)
+    return result
+
+
+def check_budget(result: Dict[str, Any], budget: Dict[str, float]) -> List[str]:
+    violations = []
+    for metric, limit in budget.items():
+        value = result.get(metric)
+        if value is not None and value > limit:
+            violations.append(f'{metric} {value:.1f} ms > {limit:.1f} ms')
+    return violations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Cold-start import-time report for backend functions')
+    parser.add_argument('functions', nargs='*', help='backend function names (default: all)')
+    parser.add_argument('--budget', default=DEFAULT_BUDGET, help='JSON file with per-function limits in ms')
+    parser.add_argument('--top', type=int, default=10, help='number of heaviest imports to list')
+    parser.add_argument('--warmup', action='store_true', help='also time warmup() (needs DATABASE_URL)')
+    args = parser.parse_args()
+
+    budgets: Dict[str, Dict[str, float]] = {}
+    if args.budget and os.path.exists(args.budget):
+        with open(args.budget) as f:
+            budgets = json.load(f)
+
+    failed = False
+    for name in args.functions or discover_functions():
+        result = profile_function(name, args.warmup)
+
+        print(f'== {name}')
+        print(f'  module init   {result["init_ms"]:8.1f} ms')
+        print(f'  OPTIONS       {result["options_ms"]:8.1f} ms')
+        if 'warmup_ms' in result:
+            steps = ', '.join(f'{step} {ms:.1f}' for step, ms in result['warmup_steps_ms'].items())
+            print(f'  warmup        {result["warmup_ms"]:8.1f} ms ({steps})')
+        print('  top imports (cumulative):')
+        for module, _, cumulative_us in result['imports'][:args.top]:
+            print(f'    {cumulative_us / 1000:8.1f} ms  {module}')
+
+        violations = check_budget(result, budgets.get(name, {}))
+        for violation in violations:
+            print(f'  OVER BUDGET: {violation}')
+        failed = failed or bool(violations)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
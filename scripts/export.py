@@ -0,0 +1,36 @@
+'''
+Business: Stream an articles-function export (articles or user progress) as NDJSON or CSV
+Args: dataset (articles|progress), --format ndjson|csv, --output file (default: stdout); needs DATABASE_URL
+Returns: exit code 0; a row/byte summary is printed to stderr
+'''
+
+import argparse
+import sys
+
+from _articles import load_articles
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Stream an export without loading it into memory')
+    parser.add_argument('dataset', choices=['articles', 'progress'])
+    parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+    parser.add_argument('--output', help='file to write (default: stdout)')
+    args = parser.parse_args()
+
+    stream = load_articles().ExportStream(args.dataset, args.format)
+    out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        for chunk in stream:
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+        else:
+            out.flush()
+
+    print(f'{stream.rows} rows, {stream.bytes} bytes', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
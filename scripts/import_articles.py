@@ -0,0 +1,52 @@
+'''
+Business: Bulk-import articles into the articles function's database via COPY
+Args: path to a JSON array or NDJSON file of CreateArticleRequest rows, --author-id, --batch-size, --strict; needs DATABASE_URL
+Returns: exit code 0 when every row was imported, 1 otherwise; per-row errors go to stderr
+'''
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, List
+
+from _articles import load_articles
+
+
+def read_rows(path: str) -> List[Any]:
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Bulk-import articles with COPY and a single merge per batch')
+    parser.add_argument('path', help='JSON array or NDJSON file')
+    parser.add_argument('--author-id', type=int, required=True, help='users.id recorded as the author')
+    parser.add_argument('--batch-size', type=int, default=1000, help='rows per COPY + merge transaction')
+    parser.add_argument('--strict', action='store_true', help='skip a whole batch if any of its rows is invalid')
+    args = parser.parse_args()
+
+    articles = load_articles()
+    rows = read_rows(args.path)
+    imported = 0
+    failed = 0
+    started = time.perf_counter()
+
+    for offset in range(0, len(rows), args.batch_size):
+        result = articles.import_articles(rows[offset:offset + args.batch_size], args.author_id, args.strict)
+        imported += len(result['imported'])
+        failed += len(result['errors'])
+        for error in result['errors']:
+            print(f'row {offset + error["row"]}: {error["error"]}', file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    rate = imported / elapsed if elapsed else 0.0
+    print(f'{imported} imported, {failed} rejected of {len(rows)} rows in {elapsed:.2f} s ({rate:.0f} rows/s)')
+    return 0 if imported == len(rows) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
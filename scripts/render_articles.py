@@ -0,0 +1,63 @@
+'''
+Business: Backfill or refresh the stored render artifacts (sanitized HTML, excerpt, word count, reading time, outline) of articles
+Args: --all to re-render every article instead of only rows with content_html IS NULL, --batch-size; needs DATABASE_URL
+Returns: exit code 0; the number of rendered articles is printed to stderr
+'''
+
+import argparse
+import sys
+from typing import Any
+
+from _articles import load_articles
+
+RENDER_UPDATE_SQL = """
+    UPDATE articles a SET
+        content_html = r.content_html,
+        excerpt = r.excerpt,
+        word_count = r.word_count,
+        reading_minutes = r.reading_minutes,
+        outline = r.outline::jsonb
+    FROM unnest(%s::integer[], %s::text[], %s::text[], %s::integer[], %s::integer[], %s::text[])
+        AS r(id, content_html, excerpt, word_count, reading_minutes, outline)
+    WHERE a.id = r.id
+"""
+
+
+def render_articles(articles: Any, rerender: bool = False, batch_size: int = 200) -> int:
+    pending = '' if rerender else ' AND content_html IS NULL'
+    rendered = 0
+    last_id = 0
+
+    with articles.get_db_connection() as conn:
+        cur = conn.cursor()
+        while True:
+            cur.execute(
+                f"SELECT id, content FROM articles WHERE id > %s{pending} ORDER BY id LIMIT %s",
+                (last_id, batch_size)
+            )
+            rows = cur.fetchall()
+            if not rows:
+                break
+            columns = list(zip(*[(article_id, *articles.render_params(content)) for article_id, content in rows]))
+            cur.execute(RENDER_UPDATE_SQL, [list(column) for column in columns])
+            conn.commit()
+            rendered += len(rows)
+            last_id = rows[-1][0]
+        cur.close()
+
+    return rendered
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Render article HTML into stored artifacts in id order')
+    parser.add_argument('--all', action='store_true', help='re-render articles that already have artifacts')
+    parser.add_argument('--batch-size', type=int, default=200, help='articles per UPDATE transaction')
+    args = parser.parse_args()
+
+    rendered = render_articles(load_articles(), args.all, args.batch_size)
+    print(f'{rendered} articles rendered', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,11 +9,22 @@ export interface User {
   subscription_date?: string;
 }
 
+export interface OutlineHeading {
+  level: number;
+  text: string;
+  id: string;
+}
+
 export interface Article {
   id: number;
   title: string;
   slug: string;
-  content: string;
+  content?: string;
+  content_html?: string;
+  excerpt?: string;
+  word_count?: number;
+  reading_minutes?: number;
+  outline?: OutlineHeading[];
   preview_text?: string;
   category?: string;
   main_image_url?: string;
@@ -36,6 +47,49 @@ export interface UserProgress {
   category?: string;
 }
 
+export interface CategoryProgress {
+  category: string;
+  available: number;
+  started: number;
+  completed: number;
+  completion_percent: number;
+  average_progress: number;
+}
+
+export interface ProgressSummary {
+  available: number;
+  started: number;
+  completed: number;
+  completion_percent: number;
+  average_progress: number;
+  categories: CategoryProgress[];
+  resume: {
+    article_id: number;
+    title: string;
+    slug: string;
+    category?: string;
+    progress_percent: number;
+    last_visited_at: string;
+  } | null;
+}
+
+export interface ArticleFacets {
+  published: number;
+  categories: Record<string, number>;
+  statuses: Record<string, number>;
+}
+
+export interface BatchRequestItem {
+  query: Record<string, string>;
+  headers?: Record<string, string>;
+}
+
+export interface BatchResult<T = unknown> {
+  status: number;
+  headers: Record<string, string>;
+  body: T | null;
+}
+
 export const authApi = {
   async register(email: string, name: string, password: string) {
     const response = await fetch(AUTH_API_URL, {
@@ -74,23 +128,71 @@ export const authApi = {
   },
 };
 
+const READ_PRIMARY_HEADER = 'X-Read-Primary-Until';
+
+let readPrimaryToken: string | null = null;
+
+async function articlesFetch(url: string, init: RequestInit = {}) {
+  const headers = new Headers(init.headers);
+  if (readPrimaryToken && Number(readPrimaryToken.split('.')[0]) * 1000 > Date.now()) {
+    headers.set(READ_PRIMARY_HEADER, readPrimaryToken);
+  }
+
+  const response = await fetch(url, { ...init, headers });
+  const issued = response.headers.get(READ_PRIMARY_HEADER);
+  if (issued) readPrimaryToken = issued;
+  return response;
+}
+
 export const articlesApi = {
-  async getAll(status?: 'draft' | 'published', category?: string) {
+  async getAll(status?: 'draft' | 'published', category?: string, cursor?: string) {
     const params = new URLSearchParams();
     if (status) params.set('status', status);
     if (category) params.set('category', category);
+    if (cursor) params.set('cursor', cursor);
     
-    const response = await fetch(`${ARTICLES_API_URL}?${params.toString()}`);
+    const response = await articlesFetch(`${ARTICLES_API_URL}?${params.toString()}`);
+    return response.json();
+  },
+
+  async sync(since: string, status?: 'draft' | 'published', category?: string) {
+    const params = new URLSearchParams({ since });
+    if (status) params.set('status', status);
+    if (category) params.set('category', category);
+
+    const response = await articlesFetch(`${ARTICLES_API_URL}?${params.toString()}`);
+    return response.json();
+  },
+
+  async search(q: string, category?: string, offset?: number) {
+    const params = new URLSearchParams({ action: 'search', q });
+    if (category) params.set('category', category);
+    if (offset) params.set('offset', String(offset));
+
+    const response = await articlesFetch(`${ARTICLES_API_URL}?${params.toString()}`);
     return response.json();
   },
 
-  async getById(id: number) {
-    const response = await fetch(`${ARTICLES_API_URL}?id=${id}`);
+  async getFacets(): Promise<{ facets: ArticleFacets }> {
+    const response = await articlesFetch(`${ARTICLES_API_URL}?action=facets`);
+    return response.json();
+  },
+
+  async getById(id: number, view?: 'edit') {
+    const params = new URLSearchParams({ id: String(id) });
+    if (view) params.set('view', view);
+
+    const response = await articlesFetch(`${ARTICLES_API_URL}?${params.toString()}`);
+    return response.json();
+  },
+
+  async getBySlug(slug: string) {
+    const response = await articlesFetch(`${ARTICLES_API_URL}?slug=${encodeURIComponent(slug)}`);
     return response.json();
   },
 
   async create(token: string, articleData: Partial<Article>) {
-    const response = await fetch(ARTICLES_API_URL, {
+    const response = await articlesFetch(ARTICLES_API_URL, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
@@ -102,7 +204,7 @@ export const articlesApi = {
   },
 
   async update(token: string, id: number, articleData: Partial<Article>) {
-    const response = await fetch(ARTICLES_API_URL, {
+    const response = await articlesFetch(ARTICLES_API_URL, {
       method: 'PUT',
       headers: {
         'Content-Type': 'application/json',
@@ -114,7 +216,7 @@ export const articlesApi = {
   },
 
   async updateProgress(token: string, article_id: number, progress_percent: number, completed: boolean) {
-    const response = await fetch(ARTICLES_API_URL, {
+    const response = await articlesFetch(ARTICLES_API_URL, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
@@ -125,17 +227,55 @@ export const articlesApi = {
     return response.json();
   },
 
-  async getUserProgress(token: string) {
-    const response = await fetch(`${ARTICLES_API_URL}?action=progress`, {
+  async updateProgressBatch(
+    token: string,
+    entries: { article_id: number; progress_percent: number; completed: boolean }[]
+  ) {
+    const response = await articlesFetch(ARTICLES_API_URL, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'X-Auth-Token': token,
+      },
+      body: JSON.stringify({ action: 'update_progress_batch', entries }),
+    });
+    return response.json();
+  },
+
+  async getUserProgress(token: string, cursor?: string, limit?: number) {
+    const params = new URLSearchParams({ action: 'progress' });
+    if (cursor) params.set('cursor', cursor);
+    if (limit) params.set('limit', String(limit));
+
+    const response = await articlesFetch(`${ARTICLES_API_URL}?${params.toString()}`, {
+      headers: { 'X-Auth-Token': token },
+    });
+    return response.json();
+  },
+
+  async getProgressSummary(token: string): Promise<{ summary: ProgressSummary }> {
+    const response = await articlesFetch(`${ARTICLES_API_URL}?action=progress&view=summary`, {
       headers: { 'X-Auth-Token': token },
     });
     return response.json();
   },
 
   async getStats(token: string) {
-    const response = await fetch(`${ARTICLES_API_URL}?action=stats`, {
+    const response = await articlesFetch(`${ARTICLES_API_URL}?action=stats`, {
       headers: { 'X-Auth-Token': token },
     });
     return response.json();
   },
+
+  async batch(requests: BatchRequestItem[], token?: string): Promise<{ results: BatchResult[] }> {
+    const headers: Record<string, string> = { 'Content-Type': 'application/json' };
+    if (token) headers['X-Auth-Token'] = token;
+
+    const response = await articlesFetch(ARTICLES_API_URL, {
+      method: 'POST',
+      headers,
+      body: JSON.stringify({ action: 'batch', requests }),
+    });
+    return response.json();
+  },
 };
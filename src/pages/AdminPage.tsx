@@ -15,6 +15,7 @@ export default function AdminPage() {
   const [articles, setArticles] = useState<Article[]>([]);
   const [stats, setStats] = useState({ total_articles: 0, total_users: 0, subscribers: 0 });
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [filter, setFilter] = useState<'all' | 'published' | 'draft'>('all');
 
   useEffect(() => {
@@ -32,6 +33,7 @@ export default function AdminPage() {
 
     if (articlesData.articles) {
       setArticles(articlesData.articles);
+      setNextCursor(articlesData.next_cursor ?? null);
     }
     if (statsData.stats) {
       setStats(statsData.stats);
@@ -39,6 +41,16 @@ export default function AdminPage() {
     setLoading(false);
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+
+    const articlesData = await articlesApi.getAll(undefined, undefined, nextCursor);
+    if (articlesData.articles) {
+      setArticles((prev) => [...prev, ...articlesData.articles]);
+      setNextCursor(articlesData.next_cursor ?? null);
+    }
+  };
+
   const filteredArticles = articles.filter((article) => {
     if (filter === 'all') return true;
     return article.status === filter;
@@ -159,6 +171,13 @@ export default function AdminPage() {
                     </TableBody>
                   </Table>
                 )}
+                {!loading && nextCursor && (
+                  <div className="flex justify-center mt-6">
+                    <Button variant="outline" onClick={loadMore}>
+                      Показать ещё
+                    </Button>
+                  </div>
+                )}
               </TabsContent>
             </Tabs>
           </CardContent>
@@ -28,11 +28,11 @@ export default function ArticleEditorPage() {
   useEffect(() => {
     if (!isNew && id) {
       setLoading(true);
-      articlesApi.getById(parseInt(id)).then((data) => {
+      articlesApi.getById(parseInt(id), 'edit').then((data) => {
         if (data.article) {
           const article: Article = data.article;
           setTitle(article.title);
-          setContent(article.content);
+          setContent(article.content || '');
           setPreviewText(article.preview_text || '');
           setCategory(article.category || '');
           setMainImageUrl(article.main_image_url || '');
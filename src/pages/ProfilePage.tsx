@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react';
 import { useAuth } from '@/contexts/AuthContext';
-import { articlesApi, UserProgress } from '@/lib/api';
+import { articlesApi, ProgressSummary, UserProgress } from '@/lib/api';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Progress } from '@/components/ui/progress';
@@ -10,13 +10,19 @@ import Icon from '@/components/ui/icon';
 export default function ProfilePage() {
   const { user, logout, token } = useAuth();
   const [progress, setProgress] = useState<UserProgress[]>([]);
+  const [summary, setSummary] = useState<ProgressSummary | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     if (token) {
-      articlesApi.getUserProgress(token).then((data) => {
+      Promise.all([articlesApi.getProgressSummary(token), articlesApi.getUserProgress(token)]).then(([summaryData, data]) => {
+        if (summaryData.summary) {
+          setSummary(summaryData.summary);
+        }
         if (data.progress) {
           setProgress(data.progress);
+          setNextCursor(data.next_cursor);
         }
         setLoading(false);
       });
@@ -25,10 +31,19 @@ export default function ProfilePage() {
 
   if (!user) return null;
 
-  const completedCount = progress.filter((p) => p.completed).length;
-  const totalProgress = progress.length > 0
-    ? Math.round(progress.reduce((sum, p) => sum + p.progress_percent, 0) / progress.length)
-    : 0;
+  const loadMore = () => {
+    if (!token || !nextCursor) return;
+    articlesApi.getUserProgress(token, nextCursor).then((data) => {
+      if (data.progress) {
+        setProgress((current) => [...current, ...data.progress]);
+        setNextCursor(data.next_cursor);
+      }
+    });
+  };
+
+  const completedCount = summary?.completed ?? 0;
+  const startedCount = summary?.started ?? 0;
+  const totalProgress = Math.round(summary?.average_progress ?? 0);
 
   const getInitials = (name: string) => {
     return name
@@ -110,7 +125,7 @@ export default function ProfilePage() {
                       <p className="text-sm text-muted-foreground">Общий прогресс</p>
                       <p className="text-3xl font-bold">{totalProgress}%</p>
                       <p className="text-sm text-muted-foreground mt-1">
-                        Завершено {completedCount} из {progress.length}
+                        Завершено {completedCount} из {startedCount}
                       </p>
                     </div>
                     <Icon name="TrendingUp" size={48} className="text-primary" />
@@ -132,6 +147,12 @@ export default function ProfilePage() {
                       </div>
                     ))}
                   </div>
+
+                  {nextCursor && (
+                    <Button variant="outline" className="w-full" onClick={loadMore}>
+                      Показать ещё
+                    </Button>
+                  )}
                 </div>
               )}
             </CardContent>